@@ -0,0 +1,10 @@
+-- Adiciona campo com o modelo OpenAI usado em cada análise
+ALTER TABLE message_analyses 
+ADD COLUMN IF NOT EXISTS model TEXT;
+
+-- Índice para acompanhar o uso de cada modelo
+CREATE INDEX IF NOT EXISTS idx_message_analyses_model 
+    ON message_analyses(model);
+
+-- Comentário explicativo
+COMMENT ON COLUMN message_analyses.model IS 'Modelo OpenAI escolhido pelo roteador para gerar a análise';
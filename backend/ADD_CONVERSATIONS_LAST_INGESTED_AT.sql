@@ -0,0 +1,30 @@
+-- Adiciona campo com o instante em que a última mensagem da conversa foi gravada
+-- (diferente de last_message_date, que é quando a mensagem foi enviada)
+ALTER TABLE conversations 
+ADD COLUMN IF NOT EXISTS last_ingested_at TIMESTAMPTZ;
+
+-- Índice para o agendador de reanálise buscar conversas com mensagens novas
+CREATE INDEX IF NOT EXISTS idx_conversations_last_ingested_at 
+    ON conversations(last_ingested_at);
+
+-- Trigger: atualiza last_ingested_at quando uma mensagem nova é inserida
+-- (AFTER INSERT não dispara para upserts que só atualizam mensagens existentes)
+CREATE OR REPLACE FUNCTION update_conversation_last_ingested_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE conversations
+    SET last_ingested_at = NOW()
+    WHERE conversation_id = NEW.conversation_id;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS update_conversation_last_ingested_at ON messages;
+
+CREATE TRIGGER update_conversation_last_ingested_at 
+    AFTER INSERT ON messages
+    FOR EACH ROW
+    EXECUTE FUNCTION update_conversation_last_ingested_at();
+
+-- Comentário explicativo
+COMMENT ON COLUMN conversations.last_ingested_at IS 'Instante em que a última mensagem da conversa foi gravada no banco (usado pela reanálise automática)';
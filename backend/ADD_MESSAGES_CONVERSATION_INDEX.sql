@@ -0,0 +1,4 @@
+-- Índice para o backfill de telefones percorrer as mensagens conversa a conversa
+-- (keyset por conversation_id, message_id)
+CREATE INDEX IF NOT EXISTS idx_messages_conversation_message 
+    ON messages(conversation_id, message_id);
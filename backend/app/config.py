@@ -2,8 +2,9 @@
 Configurações da aplicação
 Carrega variáveis de ambiente do arquivo .env
 """
+import json
 import os
-from typing import List
+from typing import List, Dict, Any
 from dotenv import load_dotenv
 
 # Carrega variáveis do .env
@@ -16,11 +17,41 @@ class Settings:
     # OpenAI
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    OPENAI_FAST_MODEL: str = os.getenv("OPENAI_FAST_MODEL", "gpt-4.1-nano")
+    OPENAI_TIMEOUT_SECONDS: float = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "30"))
+    # Timeout mínimo da tentativa cortada no SLO (quando há fallback)
+    OPENAI_MIN_TIMEOUT_SECONDS: float = float(os.getenv("OPENAI_MIN_TIMEOUT_SECONDS", "2"))
+    
+    # Roteamento de modelos (JSON opcional; vazio usa a tabela padrão)
+    # Ex.: [{"analysis_types": ["sentiment"], "max_input_tokens": 4000,
+    #        "model": "gpt-4.1-nano", "fallback": "gpt-4o-mini", "latency_slo_ms": 3000}]
+    OPENAI_MODEL_ROUTES: str = os.getenv("OPENAI_MODEL_ROUTES", "")
+    OPENAI_ROUTER_ERROR_THRESHOLD: int = int(os.getenv("OPENAI_ROUTER_ERROR_THRESHOLD", "3"))
+    OPENAI_ROUTER_COOLDOWN_SECONDS: int = int(os.getenv("OPENAI_ROUTER_COOLDOWN_SECONDS", "60"))
+    
+    # Reanálise automática (agendador)
+    AUTO_ANALYSIS_ENABLED: bool = os.getenv("AUTO_ANALYSIS_ENABLED", "false").lower() == "true"
+    AUTO_ANALYSIS_TYPES: List[str] = os.getenv("AUTO_ANALYSIS_TYPES", "lead_quality").split(",")
+    AUTO_ANALYSIS_DEBOUNCE_SECONDS: int = int(os.getenv("AUTO_ANALYSIS_DEBOUNCE_SECONDS", "120"))
+    AUTO_ANALYSIS_MAX_CALLS_PER_HOUR: int = int(os.getenv("AUTO_ANALYSIS_MAX_CALLS_PER_HOUR", "120"))
+    AUTO_ANALYSIS_POLL_SECONDS: int = int(os.getenv("AUTO_ANALYSIS_POLL_SECONDS", "30"))
     
     # Supabase
     SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
     SUPABASE_KEY: str = os.getenv("SUPABASE_KEY", "")
     
+    # Backfill de telefones
+    PHONE_BACKFILL_CHUNK_SIZE: int = int(os.getenv("PHONE_BACKFILL_CHUNK_SIZE", "5000"))
+    PHONE_BACKFILL_WORKERS: int = int(os.getenv("PHONE_BACKFILL_WORKERS", str(os.cpu_count() or 2)))
+    PHONE_BACKFILL_CHECKPOINT: str = os.getenv("PHONE_BACKFILL_CHECKPOINT", "phone_backfill.checkpoint.json")
+    
+    # Extração de telefones pela API (/api/phones/extract)
+    PHONE_EXTRACT_MAX_MESSAGES: int = int(os.getenv("PHONE_EXTRACT_MAX_MESSAGES", "5000"))
+    PHONE_EXTRACT_WORKERS: int = int(os.getenv("PHONE_EXTRACT_WORKERS", "2"))
+    
+    # Cache de configurações (/api/settings)
+    SETTINGS_CACHE_TTL_SECONDS: int = int(os.getenv("SETTINGS_CACHE_TTL_SECONDS", "60"))
+    
     # API
     API_HOST: str = os.getenv("API_HOST", "0.0.0.0")
     API_PORT: int = int(os.getenv("API_PORT", "8000"))
@@ -36,6 +67,41 @@ class Settings:
         """Verifica se OpenAI está configurado"""
         return bool(self.OPENAI_API_KEY)
     
+    @property
+    def model_routes(self) -> List[Dict[str, Any]]:
+        """
+        Tabela de roteamento de modelos
+        
+        A primeira rota compatível com o tipo de análise e o tamanho da
+        entrada é usada; a última rota deve aceitar qualquer entrada.
+        """
+        if self.OPENAI_MODEL_ROUTES:
+            return json.loads(self.OPENAI_MODEL_ROUTES)
+        
+        return [
+            {
+                "analysis_types": ["sentiment", "intent"],
+                "max_input_tokens": 4000,
+                "model": self.OPENAI_FAST_MODEL,
+                "fallback": self.OPENAI_MODEL,
+                "latency_slo_ms": 3000
+            },
+            {
+                "analysis_types": ["lead_quality"],
+                "max_input_tokens": 2000,
+                "model": self.OPENAI_FAST_MODEL,
+                "fallback": self.OPENAI_MODEL,
+                "latency_slo_ms": 3000
+            },
+            {
+                "analysis_types": "*",
+                "max_input_tokens": None,
+                "model": self.OPENAI_MODEL,
+                "fallback": self.OPENAI_FAST_MODEL,
+                "latency_slo_ms": 8000
+            }
+        ]
+    
     @property
     def is_supabase_configured(self) -> bool:
         """Verifica se Supabase está configurado"""
@@ -5,7 +5,7 @@ import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.routes import analysis
+from app.routes import analysis, phones, settings as settings_routes
 
 # Configura logging
 logging.basicConfig(
@@ -34,10 +34,32 @@ app.add_middleware(
 
 # Inclui rotas
 app.include_router(analysis.router)
+app.include_router(settings_routes.router)
+app.include_router(phones.router)
 
 logger.info("Aplicação FastAPI inicializada")
 
 
+@app.on_event("startup")
+async def start_analysis_scheduler():
+    """Inicia o agendador de reanálise automática, se habilitado"""
+    if settings.AUTO_ANALYSIS_ENABLED and analysis.analysis_scheduler:
+        analysis.analysis_scheduler.start()
+
+
+@app.on_event("shutdown")
+async def stop_analysis_scheduler():
+    """Interrompe o agendador de reanálise automática"""
+    if analysis.analysis_scheduler:
+        await analysis.analysis_scheduler.stop()
+
+
+@app.on_event("shutdown")
+async def stop_phone_extraction():
+    """Encerra o pool de processos da extração de telefones"""
+    phones.shutdown_extract_pool()
+
+
 @app.get("/")
 async def root():
     """
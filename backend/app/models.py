@@ -45,11 +45,100 @@ class AnalysisRequest(BaseModel):
     )
 
 
+class NewMessagesNotification(BaseModel):
+    """Aviso de mensagens novas numa conversa (agenda reanálise)"""
+    conversation_id: str = Field(..., description="ID da conversa")
+    last_message_at: Optional[str] = Field(None, description="Timestamp ISO da última mensagem")
+    has_unread: bool = Field(False, description="Se a conversa tem mensagens não lidas")
+
+
 class AnalysisResponse(BaseModel):
     """Response da análise"""
     success: bool = Field(..., description="Indica se a análise foi bem-sucedida")
     conversation_id: str = Field(..., description="ID da conversa")
     analysis_type: str = Field(..., description="Tipo de análise realizada")
     result: Optional[Dict[str, Any]] = Field(None, description="Resultado da análise")
+    model: Optional[str] = Field(None, description="Modelo OpenAI usado na análise")
     error: Optional[str] = Field(None, description="Mensagem de erro, se houver")
 
+
+
+class SummaryKeyInfo(BaseModel):
+    """Informações principais extraídas do resumo"""
+    cliente: str = Field(..., description="Nome ou informações do cliente")
+    propriedade: str = Field(..., description="Informações sobre a propriedade de interesse")
+    interesse: str = Field(..., description="Nível de interesse do cliente")
+    contato: str = Field(..., description="Informações de contato relevantes")
+
+
+class SummaryResult(BaseModel):
+    """Resultado da análise do tipo summary"""
+    key_info: SummaryKeyInfo = Field(..., description="Informações principais da conversa")
+    next_steps: List[str] = Field(..., description="Próximos passos sugeridos")
+    summary: str = Field(..., description="Resumo geral da conversa")
+
+
+class SentimentResult(BaseModel):
+    """Resultado da análise do tipo sentiment"""
+    score: float = Field(..., ge=-1, le=1, description="Score de -1 (negativo) a 1 (positivo)")
+    sentiment: Literal["positive", "neutral", "negative"] = Field(..., description="Sentimento geral")
+    indicators: List[str] = Field(..., description="Indicadores que justificam o sentimento")
+
+
+class IntentResult(BaseModel):
+    """Resultado da análise do tipo intent"""
+    intent: Literal["high", "medium", "low"] = Field(..., description="Intenção de compra")
+    confidence: float = Field(..., ge=0, le=1, description="Confiança na análise, de 0 a 1")
+    urgency: Literal["high", "medium", "low"] = Field(..., description="Urgência do cliente")
+    reasons: List[str] = Field(..., description="Razões que justificam a intenção")
+
+
+class LeadQualityResult(BaseModel):
+    """Resultado da análise do tipo lead_quality"""
+    quality: Literal["hot", "warm", "cold"] = Field(..., description="Qualificação do lead")
+    score: int = Field(..., ge=0, le=100, description="Score de 0 a 100")
+    reasons: List[str] = Field(..., description="Razões da qualificação")
+    follow_up_suggestions: List[str] = Field(..., description="Sugestões de follow-up")
+
+
+# Modelo de resultado esperado para cada tipo de análise
+ANALYSIS_RESULT_MODELS: Dict[str, type[BaseModel]] = {
+    "summary": SummaryResult,
+    "sentiment": SentimentResult,
+    "intent": IntentResult,
+    "lead_quality": LeadQualityResult,
+}
+
+
+class GeneralSettingsUpdate(BaseModel):
+    """Atualização parcial de general_settings"""
+    auto_reload_enabled: Optional[bool] = Field(None, description="Recarregamento automático ativo")
+    auto_reload_min_minutes: Optional[int] = Field(None, ge=1, description="Intervalo mínimo (minutos)")
+    auto_reload_max_minutes: Optional[int] = Field(None, ge=1, description="Intervalo máximo (minutos)")
+    refresh_after_conversation: Optional[bool] = Field(None, description="Recarregar após processar conversa")
+
+
+class AgentIASettingsUpdate(BaseModel):
+    """Atualização parcial de agent_ia_settings"""
+    openai_key: Optional[str] = Field(None, description="Chave OpenAI do Agente IA (nunca retornada)")
+    phone_prompt: Optional[str] = Field(None, description="Prompt para solicitar telefone")
+    enabled: Optional[bool] = Field(None, description="Agente IA ativo")
+
+
+class PhoneExtractionMessage(BaseModel):
+    """Mensagem para extração de telefone"""
+    conversation_id: str = Field(..., description="ID da conversa")
+    content: str = Field(..., description="Conteúdo da mensagem")
+
+
+class PhoneExtractionRequest(BaseModel):
+    """Request de extração de telefones em lote"""
+    messages: List[PhoneExtractionMessage] = Field(..., description="Mensagens a processar")
+    save: bool = Field(False, description="Grava o telefone nas conversas sem phone_number")
+
+
+class PhoneBackfillRequest(BaseModel):
+    """Request para iniciar o backfill de telefones"""
+    overwrite: bool = Field(False, description="Sobrescreve telefones já preenchidos")
+    reset: bool = Field(False, description="Descarta o checkpoint e recomeça do início")
+    max_messages: Optional[int] = Field(None, ge=1, description="Limite de mensagens nesta execução")
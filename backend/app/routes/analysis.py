@@ -3,10 +3,11 @@ Rotas de análise de mensagens
 """
 import logging
 from fastapi import APIRouter, HTTPException, status
-from app.models import AnalysisRequest, AnalysisResponse
+from app.models import AnalysisRequest, AnalysisResponse, NewMessagesNotification
 from app.config import settings
 from app.services.openai_service import OpenAIService
 from app.services.supabase_service import SupabaseService
+from app.services.analysis_scheduler import AnalysisScheduler
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +27,11 @@ try:
 except Exception as e:
     logger.error(f"Erro ao inicializar Supabase Service: {e}")
 
+# Agendador de reanálise automática (iniciado no startup da aplicação)
+analysis_scheduler = None
+if openai_service and supabase_service:
+    analysis_scheduler = AnalysisScheduler(openai_service, supabase_service)
+
 
 @router.get("/health")
 async def health_check():
@@ -42,6 +48,107 @@ async def health_check():
     }
 
 
+@router.get("/models")
+async def model_stats():
+    """
+    Retorna a tabela de rotas e a saúde de cada modelo
+    
+    Returns:
+        Dicionário com rotas e estatísticas por modelo
+        
+    Raises:
+        HTTPException: Se OpenAI não estiver configurado
+    """
+    if not openai_service:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="OpenAI não está configurado"
+        )
+    
+    return openai_service.router.get_stats()
+
+
+@router.post("/notify")
+async def notify_new_messages(notification: NewMessagesNotification):
+    """
+    Agenda reanálise de uma conversa que recebeu mensagens novas
+    
+    A reanálise roda após o debounce (AUTO_ANALYSIS_DEBOUNCE_SECONDS) contado
+    a partir da última notificação da conversa.
+    
+    Args:
+        notification: Conversa e dados da última mensagem
+        
+    Returns:
+        Dicionário confirmando o agendamento
+        
+    Raises:
+        HTTPException: Se o agendador não estiver ativo
+    """
+    if not analysis_scheduler or not analysis_scheduler.is_running:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Reanálise automática não está ativa"
+        )
+    
+    analysis_scheduler.notify(
+        conversation_id=notification.conversation_id,
+        last_message_at=notification.last_message_at,
+        has_unread=notification.has_unread
+    )
+    
+    return {"scheduled": True, "conversation_id": notification.conversation_id}
+
+
+@router.get("/scheduler")
+async def scheduler_status():
+    """
+    Retorna o estado do agendador de reanálise
+    
+    Returns:
+        Dicionário com jobs pendentes, orçamento e contadores
+    """
+    if not analysis_scheduler:
+        return {"running": False}
+    
+    return analysis_scheduler.get_status()
+
+
+@router.get("/{conversation_id}")
+async def get_saved_analyses(conversation_id: str):
+    """
+    Retorna as análises já salvas de uma conversa
+    
+    Args:
+        conversation_id: ID da conversa
+        
+    Returns:
+        Dicionário com as análises indexadas por tipo
+        
+    Raises:
+        HTTPException: Se Supabase não estiver configurado ou em caso de erro
+    """
+    if not supabase_service or not supabase_service.client:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Supabase não está configurado"
+        )
+    
+    try:
+        rows = await supabase_service.get_analyses(conversation_id)
+    except Exception as e:
+        logger.error(f"Erro ao buscar análises salvas: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao buscar análises: {str(e)}"
+        )
+    
+    return {
+        "conversation_id": conversation_id,
+        "analyses": {row["analysis_type"]: row for row in rows}
+    }
+
+
 @router.post("/analyze", response_model=AnalysisResponse)
 async def analyze_messages(request: AnalysisRequest):
     """
@@ -79,7 +186,7 @@ async def analyze_messages(request: AnalysisRequest):
         
         # Realiza análise
         try:
-            result = await openai_service.analyze(
+            result, model = await openai_service.analyze(
                 messages=request.messages,
                 analysis_type=request.analysis_type
             )
@@ -99,7 +206,8 @@ async def analyze_messages(request: AnalysisRequest):
                 await supabase_service.save_analysis(
                     conversation_id=request.conversation_id,
                     analysis_type=request.analysis_type,
-                    result=result
+                    result=result,
+                    model=model
                 )
             except Exception as e:
                 logger.warning(f"Erro ao salvar análise no banco: {e}")
@@ -110,6 +218,7 @@ async def analyze_messages(request: AnalysisRequest):
             conversation_id=request.conversation_id,
             analysis_type=request.analysis_type,
             result=result,
+            model=model,
             error=None
         )
         
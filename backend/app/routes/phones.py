@@ -0,0 +1,168 @@
+"""
+Rotas de extração de telefones das mensagens
+"""
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from fastapi import APIRouter, HTTPException, status
+from app.config import settings
+from app.models import PhoneExtractionRequest, PhoneBackfillRequest
+from app.services.supabase_service import SupabaseService
+from app.services.phone_extractor import best_phone, extract_phones_batch, merge_phones
+from app.services.phone_backfill import PhoneBackfill
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/phones", tags=["phones"])
+
+# Inicializa serviços
+supabase_service = None
+
+try:
+    supabase_service = SupabaseService()
+except Exception as e:
+    logger.error(f"Erro ao inicializar Supabase Service: {e}")
+
+# Pool de extração do /extract (criado no primeiro uso)
+_extract_pool: Optional[ProcessPoolExecutor] = None
+
+# Estado do backfill em execução (um por vez)
+_backfill_task: Optional[asyncio.Task] = None
+_backfill_status = {"running": False, "state": None, "error": None}
+
+
+def _ensure_supabase():
+    """Garante que o Supabase está disponível"""
+    if not supabase_service or not supabase_service.client:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Supabase não está configurado"
+        )
+
+
+def _get_extract_pool() -> ProcessPoolExecutor:
+    """Retorna o pool de processos da extração, criando-o se necessário"""
+    global _extract_pool
+    if _extract_pool is None:
+        _extract_pool = ProcessPoolExecutor(max_workers=settings.PHONE_EXTRACT_WORKERS)
+    return _extract_pool
+
+
+def shutdown_extract_pool():
+    """Encerra o pool de processos da extração"""
+    global _extract_pool
+    if _extract_pool is not None:
+        _extract_pool.shutdown(cancel_futures=True)
+        _extract_pool = None
+
+
+@router.post("/extract")
+async def extract_phones(request: PhoneExtractionRequest):
+    """
+    Extrai telefones de um lote de mensagens
+
+    Args:
+        request: Mensagens e se deve gravar nas conversas
+
+    Returns:
+        Dicionário com os telefones encontrados por conversa
+
+    Raises:
+        HTTPException: Se o lote passar de PHONE_EXTRACT_MAX_MESSAGES mensagens
+    """
+    if len(request.messages) > settings.PHONE_EXTRACT_MAX_MESSAGES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Máximo de {settings.PHONE_EXTRACT_MAX_MESSAGES} mensagens por lote"
+        )
+
+    # Extração roda no pool de processos para não travar o event loop
+    rows = [(msg.conversation_id, msg.content) for msg in request.messages]
+    loop = asyncio.get_running_loop()
+    pool = _get_extract_pool()
+    size = max(1, -(-len(rows) // settings.PHONE_EXTRACT_WORKERS))
+    found = merge_phones(await asyncio.gather(*[
+        loop.run_in_executor(pool, extract_phones_batch, rows[i:i + size])
+        for i in range(0, len(rows), size)
+    ]))
+
+    conversations = {
+        conversation_id: {"phones": phones, "phone_number": best_phone(phones)}
+        for conversation_id, phones in found.items()
+    }
+
+    updated = 0
+    if request.save and conversations:
+        _ensure_supabase()
+        try:
+            updated = await supabase_service.update_phone_numbers({
+                cid: data["phone_number"] for cid, data in conversations.items()
+            })
+        except Exception as e:
+            logger.error(f"Erro ao gravar telefones: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Erro ao gravar telefones: {str(e)}"
+            )
+
+    return {"conversations": conversations, "updated": updated}
+
+
+async def _run_backfill(backfill: PhoneBackfill, max_messages):
+    """Executa o backfill em segundo plano, atualizando o status"""
+    try:
+        state = await backfill.run(
+            max_messages=max_messages,
+            on_progress=lambda s: _backfill_status.update(state=dict(s))
+        )
+        _backfill_status.update(state=dict(state))
+    except Exception as e:
+        logger.error(f"Erro no backfill de telefones: {e}")
+        _backfill_status.update(error=str(e))
+    finally:
+        _backfill_status.update(running=False)
+
+
+@router.post("/backfill", status_code=status.HTTP_202_ACCEPTED)
+async def start_backfill(request: PhoneBackfillRequest):
+    """
+    Inicia o backfill de telefones em segundo plano (retoma do checkpoint)
+
+    Args:
+        request: Opções do backfill
+
+    Returns:
+        Status do backfill
+
+    Raises:
+        HTTPException: Se já houver um backfill em execução
+    """
+    global _backfill_task
+    _ensure_supabase()
+
+    if _backfill_status["running"]:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Backfill já está em execução"
+        )
+
+    backfill = PhoneBackfill(supabase_service, overwrite=request.overwrite)
+    if request.reset:
+        backfill.reset()
+
+    _backfill_status.update(running=True, state=dict(backfill.state), error=None)
+    _backfill_task = asyncio.create_task(_run_backfill(backfill, request.max_messages))
+
+    return _backfill_status
+
+
+@router.get("/backfill")
+async def backfill_status():
+    """
+    Retorna o status do backfill de telefones
+
+    Returns:
+        Dicionário com execução, checkpoint e erro (se houver)
+    """
+    return _backfill_status
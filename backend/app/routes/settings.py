@@ -0,0 +1,148 @@
+"""
+Rotas de configurações (general_settings e agent_ia_settings)
+"""
+import logging
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from fastapi.responses import JSONResponse
+from app.models import GeneralSettingsUpdate, AgentIASettingsUpdate
+from app.services.supabase_service import SupabaseService
+from app.services.settings_cache import SettingsCache
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/settings", tags=["settings"])
+
+# Clientes sempre revalidam; com o ETag igual a resposta é um 304 sem corpo
+CACHE_CONTROL = "private, no-cache"
+
+# Inicializa serviços
+supabase_service = None
+settings_cache = None
+
+try:
+    supabase_service = SupabaseService()
+    settings_cache = SettingsCache(supabase_service)
+except Exception as e:
+    logger.error(f"Erro ao inicializar cache de configurações: {e}")
+
+
+def _ensure_configured():
+    """Garante que o Supabase está disponível"""
+    if not settings_cache or not supabase_service.client:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Supabase não está configurado"
+        )
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Compara o header If-None-Match com o ETag atual"""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates
+
+
+async def _settings_response(request: Request) -> Response:
+    """Monta a resposta com ETag, respondendo 304 se o cliente já tem a versão"""
+    try:
+        payload, etag = await settings_cache.get()
+    except Exception as e:
+        logger.error(f"Erro ao carregar configurações: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao carregar configurações: {str(e)}"
+        )
+
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return JSONResponse(content=payload, headers=headers)
+
+
+@router.get("")
+async def get_settings(request: Request):
+    """
+    Retorna general_settings e agent_ia_settings (sem openai_key)
+
+    Args:
+        request: Requisição (usa o header If-None-Match)
+
+    Returns:
+        Configurações em JSON, ou 304 se o ETag não mudou
+
+    Raises:
+        HTTPException: Se Supabase não estiver configurado ou em caso de erro
+    """
+    _ensure_configured()
+    return await _settings_response(request)
+
+
+async def _update(table: str, updates: dict, request: Request) -> Response:
+    """Atualiza uma tabela de configuração e invalida o cache"""
+    _ensure_configured()
+
+    if not updates:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Nenhum campo para atualizar"
+        )
+
+    try:
+        await supabase_service.update_single_row(table, updates)
+    except Exception as e:
+        logger.error(f"Erro ao atualizar {table}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao atualizar configurações: {str(e)}"
+        )
+    finally:
+        settings_cache.invalidate()
+
+    return await _settings_response(request)
+
+
+@router.put("/general")
+async def update_general_settings(updates: GeneralSettingsUpdate, request: Request):
+    """
+    Atualiza general_settings e invalida o cache
+
+    Args:
+        updates: Campos a atualizar
+        request: Requisição
+
+    Returns:
+        Configurações atualizadas com o novo ETag
+    """
+    return await _update("general_settings", updates.model_dump(exclude_none=True), request)
+
+
+@router.put("/agent-ia")
+async def update_agent_ia_settings(updates: AgentIASettingsUpdate, request: Request):
+    """
+    Atualiza agent_ia_settings e invalida o cache
+
+    Args:
+        updates: Campos a atualizar
+        request: Requisição
+
+    Returns:
+        Configurações atualizadas com o novo ETag
+    """
+    return await _update("agent_ia_settings", updates.model_dump(exclude_none=True), request)
+
+
+@router.post("/invalidate")
+async def invalidate_settings():
+    """
+    Invalida o cache após alterações feitas diretamente no Supabase
+
+    Returns:
+        Dicionário confirmando a invalidação
+    """
+    _ensure_configured()
+    settings_cache.invalidate()
+    return {"invalidated": True}
@@ -0,0 +1,258 @@
+"""
+Agendador de reanálise automática de conversas
+Reanalisa cada conversa alguns minutos após a última mensagem nova (debounce)
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PendingAnalysis:
+    """Reanálise pendente de uma conversa"""
+    conversation_id: str
+    due_at: float
+    last_message_at: float = 0.0
+    has_unread: bool = False
+
+    def priority(self) -> tuple:
+        """Não lidas primeiro, depois as com mensagem mais recente"""
+        return (not self.has_unread, -self.last_message_at)
+
+
+def _parse_timestamp(value: Optional[str]) -> float:
+    """Converte timestamp ISO em epoch (0 se inválido)"""
+    if not value:
+        return 0.0
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return 0.0
+
+
+class AnalysisScheduler:
+    """Agenda reanálises por conversa com debounce e orçamento de chamadas"""
+
+    # Intervalo entre verificações de jobs vencidos (segundos)
+    TICK_SECONDS: float = 5.0
+
+    def __init__(self, openai_service, supabase_service):
+        """
+        Inicializa o agendador
+
+        Args:
+            openai_service: Serviço OpenAI usado nas análises
+            supabase_service: Serviço Supabase (leitura de mensagens e gravação)
+        """
+        self.openai_service = openai_service
+        self.supabase_service = supabase_service
+        self.analysis_types = [t.strip() for t in settings.AUTO_ANALYSIS_TYPES if t.strip()]
+        self.debounce_seconds = settings.AUTO_ANALYSIS_DEBOUNCE_SECONDS
+        self.max_calls_per_hour = settings.AUTO_ANALYSIS_MAX_CALLS_PER_HOUR
+        self.poll_seconds = settings.AUTO_ANALYSIS_POLL_SECONDS
+
+        self._pending: Dict[str, PendingAnalysis] = {}
+        self._calls: deque = deque()
+        self._task: Optional[asyncio.Task] = None
+        self._last_poll: float = float("-inf")
+        self._completed: int = 0
+        self._failed: int = 0
+
+        # Só acompanha mensagens gravadas a partir do início do agendador
+        # (comparado com conversations.last_ingested_at)
+        self._watermark: str = datetime.now(timezone.utc).isoformat()
+
+    @property
+    def is_running(self) -> bool:
+        """Indica se o loop do agendador está ativo"""
+        return self._task is not None and not self._task.done()
+
+    def notify(
+        self,
+        conversation_id: str,
+        last_message_at: Optional[str] = None,
+        has_unread: bool = False
+    ):
+        """
+        Registra mensagem nova numa conversa, (re)iniciando o debounce
+
+        Args:
+            conversation_id: ID da conversa
+            last_message_at: Timestamp ISO da última mensagem
+            has_unread: Se a conversa tem mensagens não lidas
+        """
+        due_at = time.monotonic() + self.debounce_seconds
+        last_ts = _parse_timestamp(last_message_at) or time.time()
+
+        job = self._pending.get(conversation_id)
+        if job:
+            job.due_at = due_at
+            job.last_message_at = max(job.last_message_at, last_ts)
+            job.has_unread = job.has_unread or has_unread
+        else:
+            self._pending[conversation_id] = PendingAnalysis(
+                conversation_id=conversation_id,
+                due_at=due_at,
+                last_message_at=last_ts,
+                has_unread=has_unread
+            )
+
+    def _budget_remaining(self) -> int:
+        """Chamadas OpenAI ainda disponíveis na última hora"""
+        cutoff = time.monotonic() - 3600
+        while self._calls and self._calls[0] < cutoff:
+            self._calls.popleft()
+        return self.max_calls_per_hour - len(self._calls)
+
+    def _charge_call(self, model: str):
+        """
+        Desconta uma chamada OpenAI do orçamento (inclui tentativas no fallback)
+
+        O OpenAIService desliga os retries do SDK, então cada tentativa é
+        exatamente uma requisição cobrada.
+        """
+        self._calls.append(time.monotonic())
+
+    def _due_jobs(self) -> List[PendingAnalysis]:
+        """Jobs com debounce vencido, ordenados por prioridade"""
+        now = time.monotonic()
+        due = [job for job in self._pending.values() if job.due_at <= now]
+        return sorted(due, key=PendingAnalysis.priority)
+
+    async def _poll_changes(self):
+        """Busca conversas com mensagens novas desde a última verificação"""
+        self._last_poll = time.monotonic()
+        try:
+            rows = await self.supabase_service.get_conversations_changed_since(self._watermark)
+        except Exception as e:
+            logger.warning(f"Erro ao buscar conversas alteradas: {e}")
+            return
+
+        for row in rows:
+            last_message_date = row.get("last_message_date")
+            self.notify(
+                conversation_id=row["conversation_id"],
+                last_message_at=last_message_date,
+                has_unread=bool(row.get("has_unread"))
+            )
+            last_ingested_at = row.get("last_ingested_at")
+            if _parse_timestamp(last_ingested_at) > _parse_timestamp(self._watermark):
+                self._watermark = last_ingested_at
+
+        if rows:
+            logger.info(f"{len(rows)} conversas com mensagens novas")
+
+    async def _run_job(self, job: PendingAnalysis) -> bool:
+        """
+        Executa as análises configuradas para uma conversa
+
+        Returns:
+            False se o orçamento acabou antes de concluir o job
+        """
+        # Reserva o pior caso (fallback em todas as análises) para nunca
+        # ultrapassar o orçamento no meio de um job
+        worst_case = self.openai_service.MAX_ATTEMPTS_PER_ANALYSIS * len(self.analysis_types)
+        if self._budget_remaining() < worst_case:
+            return False
+
+        self._pending.pop(job.conversation_id, None)
+
+        try:
+            messages = await self.supabase_service.get_messages(job.conversation_id)
+        except Exception as e:
+            logger.warning(f"Erro ao buscar mensagens de {job.conversation_id}: {e}")
+            self._failed += 1
+            return True
+
+        if not messages:
+            return True
+
+        for analysis_type in self.analysis_types:
+            try:
+                result, model = await self.openai_service.analyze(
+                    messages=messages,
+                    analysis_type=analysis_type,
+                    on_attempt=self._charge_call
+                )
+                await self.supabase_service.save_analysis(
+                    conversation_id=job.conversation_id,
+                    analysis_type=analysis_type,
+                    result=result,
+                    model=model
+                )
+                self._completed += 1
+            except Exception as e:
+                logger.warning(
+                    f"Erro na reanálise {analysis_type} da conversa {job.conversation_id}: {e}"
+                )
+                self._failed += 1
+
+        return True
+
+    async def _loop(self):
+        """Loop principal: verifica mudanças e executa jobs vencidos"""
+        logger.info(
+            f"Agendador de reanálise iniciado (debounce {self.debounce_seconds}s, "
+            f"{self.max_calls_per_hour} chamadas/hora, tipos {self.analysis_types})"
+        )
+        while True:
+            try:
+                if time.monotonic() - self._last_poll >= self.poll_seconds:
+                    await self._poll_changes()
+
+                for job in self._due_jobs():
+                    if not await self._run_job(job):
+                        logger.debug("Orçamento de chamadas OpenAI esgotado, aguardando")
+                        break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Erro no agendador de reanálise: {e}")
+
+            await asyncio.sleep(self.TICK_SECONDS)
+
+    def start(self):
+        """Inicia o loop do agendador no event loop atual"""
+        if self.is_running:
+            return
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        """Interrompe o loop do agendador"""
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Agendador de reanálise parado")
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Retorna o estado atual do agendador
+
+        Returns:
+            Dicionário com jobs pendentes, orçamento e contadores
+        """
+        now = time.monotonic()
+        next_due = min((job.due_at for job in self._pending.values()), default=None)
+        return {
+            "running": self.is_running,
+            "analysis_types": self.analysis_types,
+            "pending": len(self._pending),
+            "next_run_in_seconds": max(0, round(next_due - now)) if next_due is not None else None,
+            "calls_last_hour": self.max_calls_per_hour - self._budget_remaining(),
+            "max_calls_per_hour": self.max_calls_per_hour,
+            "completed": self._completed,
+            "failed": self._failed,
+            "watermark": self._watermark
+        }
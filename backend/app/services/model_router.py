@@ -0,0 +1,202 @@
+"""
+Roteamento de modelos OpenAI por tipo de análise e tamanho da conversa
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RouteDecision:
+    """Modelo escolhido para uma chamada e seu fallback"""
+    model: str
+    fallback: Optional[str]
+    latency_slo_ms: int
+    input_tokens: int
+    degraded: bool = False
+
+
+class _ModelHealth:
+    """Estado de saúde de um modelo (latência média e erros recentes)"""
+
+    def __init__(self):
+        self.latency_ms: Optional[float] = None
+        self.consecutive_errors: int = 0
+        self.open_until: float = 0.0
+        self.calls: int = 0
+        self.errors: int = 0
+
+
+class ModelRouter:
+    """Escolhe o modelo de cada análise a partir da tabela de rotas"""
+
+    # Peso da última chamada na média móvel exponencial de latência
+    LATENCY_ALPHA: float = 0.3
+
+    def __init__(self, routes: Optional[List[Dict[str, Any]]] = None):
+        """
+        Inicializa o roteador
+
+        Args:
+            routes: Tabela de rotas (padrão: settings.model_routes)
+        """
+        self.routes = routes if routes is not None else settings.model_routes
+        self.error_threshold = settings.OPENAI_ROUTER_ERROR_THRESHOLD
+        self.cooldown_seconds = settings.OPENAI_ROUTER_COOLDOWN_SECONDS
+        self._health: Dict[str, _ModelHealth] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """
+        Estima o número de tokens de um texto (~4 caracteres por token)
+
+        Args:
+            text: Texto de entrada
+
+        Returns:
+            Número aproximado de tokens
+        """
+        return len(text) // 4 + 1
+
+    def _get_health(self, model: str) -> _ModelHealth:
+        if model not in self._health:
+            self._health[model] = _ModelHealth()
+        return self._health[model]
+
+    def _find_route(self, analysis_type: str, input_tokens: int) -> Dict[str, Any]:
+        for route in self.routes:
+            types = route.get("analysis_types", "*")
+            if types != "*" and analysis_type not in types:
+                continue
+            max_tokens = route.get("max_input_tokens")
+            if max_tokens is not None and input_tokens > max_tokens:
+                continue
+            return route
+
+        # Nenhuma rota compatível: usa o modelo global
+        return {"model": settings.OPENAI_MODEL, "fallback": None, "latency_slo_ms": 8000}
+
+    def is_available(self, model: str) -> bool:
+        """
+        Verifica se o modelo não está em cooldown por lentidão ou erros
+
+        Args:
+            model: Nome do modelo
+
+        Returns:
+            True se o modelo pode receber chamadas
+        """
+        with self._lock:
+            return time.monotonic() >= self._get_health(model).open_until
+
+    def select(self, analysis_type: str, input_text: str) -> RouteDecision:
+        """
+        Escolhe o modelo para uma análise
+
+        Args:
+            analysis_type: Tipo de análise
+            input_text: Texto completo enviado ao modelo (prompts)
+
+        Returns:
+            Decisão de roteamento
+        """
+        input_tokens = self.estimate_tokens(input_text)
+        route = self._find_route(analysis_type, input_tokens)
+        model = route["model"]
+        fallback = route.get("fallback")
+        slo = int(route.get("latency_slo_ms", 8000))
+
+        if fallback and fallback != model and not self.is_available(model):
+            logger.info(f"Modelo {model} indisponível, usando fallback {fallback}")
+            return RouteDecision(
+                model=fallback,
+                fallback=None,
+                latency_slo_ms=slo,
+                input_tokens=input_tokens,
+                degraded=True
+            )
+
+        return RouteDecision(
+            model=model,
+            fallback=fallback if fallback != model else None,
+            latency_slo_ms=slo,
+            input_tokens=input_tokens
+        )
+
+    def record_success(self, model: str, latency_ms: float, latency_slo_ms: int):
+        """
+        Registra uma chamada bem-sucedida
+
+        Se a latência média ultrapassar o SLO, o modelo entra em cooldown e
+        as próximas chamadas vão para o fallback.
+
+        Args:
+            model: Nome do modelo
+            latency_ms: Latência da chamada em milissegundos
+            latency_slo_ms: SLO de latência da rota
+        """
+        with self._lock:
+            health = self._get_health(model)
+            health.calls += 1
+            health.consecutive_errors = 0
+            if health.latency_ms is None:
+                health.latency_ms = latency_ms
+            else:
+                health.latency_ms = (
+                    self.LATENCY_ALPHA * latency_ms
+                    + (1 - self.LATENCY_ALPHA) * health.latency_ms
+                )
+
+            if health.latency_ms > latency_slo_ms:
+                logger.warning(
+                    f"Modelo {model} acima do SLO "
+                    f"({health.latency_ms:.0f}ms > {latency_slo_ms}ms), em cooldown"
+                )
+                health.open_until = time.monotonic() + self.cooldown_seconds
+                # Reinicia a média para reavaliar o modelo após o cooldown
+                health.latency_ms = None
+
+    def record_failure(self, model: str):
+        """
+        Registra uma chamada com erro
+
+        Args:
+            model: Nome do modelo
+        """
+        with self._lock:
+            health = self._get_health(model)
+            health.calls += 1
+            health.errors += 1
+            health.consecutive_errors += 1
+            if health.consecutive_errors >= self.error_threshold:
+                logger.warning(
+                    f"Modelo {model} com {health.consecutive_errors} erros seguidos, em cooldown"
+                )
+                health.open_until = time.monotonic() + self.cooldown_seconds
+                health.consecutive_errors = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna estatísticas por modelo para ajuste da tabela de rotas
+
+        Returns:
+            Dicionário com rotas e saúde de cada modelo
+        """
+        now = time.monotonic()
+        with self._lock:
+            models = {
+                model: {
+                    "calls": health.calls,
+                    "errors": health.errors,
+                    "latency_ms": round(health.latency_ms) if health.latency_ms is not None else None,
+                    "available": now >= health.open_until
+                }
+                for model, health in self._health.items()
+            }
+        return {"routes": self.routes, "models": models}
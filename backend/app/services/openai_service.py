@@ -1,13 +1,21 @@
 """
 Serviço de integração com OpenAI API
 """
-import json
 import logging
+import time
 from datetime import datetime
-from typing import Dict, Any, List, Literal
-from openai import OpenAI
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple
+import httpx
+from openai import (
+    APIError,
+    AsyncOpenAI,
+    ContentFilterFinishReasonError,
+    LengthFinishReasonError,
+)
+from pydantic import ValidationError
 from app.config import settings
-from app.models import Message
+from app.models import Message, ANALYSIS_RESULT_MODELS
+from app.services.model_router import ModelRouter
 
 logger = logging.getLogger(__name__)
 
@@ -15,14 +23,42 @@ logger = logging.getLogger(__name__)
 class OpenAIService:
     """Serviço para análise de mensagens usando OpenAI"""
     
-    def __init__(self):
-        """Inicializa o serviço OpenAI"""
+    # Limite de tokens de saída por tipo de análise
+    MAX_TOKENS: Dict[str, int] = {
+        "summary": 500,
+        "sentiment": 200,
+        "intent": 220,
+        "lead_quality": 300,
+    }
+    
+    TEMPERATURE: float = 0.2
+    
+    # Chamadas à API por análise no pior caso (modelo escolhido + fallback)
+    MAX_ATTEMPTS_PER_ANALYSIS: int = 2
+    
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
+        """
+        Inicializa o serviço OpenAI
+        
+        Os retries automáticos do SDK ficam desligados: quem repete é o
+        analyze(), no fallback, para que cada tentativa seja uma requisição
+        e o SLO da rota seja respeitado.
+        
+        Args:
+            http_client: Client HTTP a usar no SDK (opcional, usado nos testes)
+        """
         if not settings.is_openai_configured:
             logger.warning("OpenAI não está configurado")
             self.client = None
         else:
-            self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+            self.client = AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                max_retries=0,
+                http_client=http_client
+            )
             logger.info("OpenAI Service inicializado")
+        
+        self.router = ModelRouter()
     
     def _prepare_messages_context(self, messages: List[Message]) -> str:
         """
@@ -63,39 +99,22 @@ class OpenAIService:
 Analise a conversa fornecida e retorne um resumo estruturado em JSON com as seguintes informações:
 - key_info: objeto com informações principais (cliente, propriedade, interesse, contato)
 - next_steps: array de strings com próximos passos sugeridos
-- summary: string com resumo geral da conversa""",
-                "user": f"""Analise a seguinte conversa e retorne um JSON com o resumo estruturado:
-
-{messages_context}
+- summary: string com resumo geral da conversa
+Seja conciso: no máximo 3 próximos passos e um resumo de até 3 frases.""",
+                "user": f"""Analise a seguinte conversa e retorne o resumo estruturado:
 
-Retorne APENAS um JSON válido com a estrutura:
-{{
-    "key_info": {{
-        "cliente": "nome ou informações do cliente",
-        "propriedade": "informações sobre a propriedade de interesse",
-        "interesse": "nível de interesse do cliente",
-        "contato": "informações de contato relevantes"
-    }},
-    "next_steps": ["próximo passo 1", "próximo passo 2"],
-    "summary": "resumo geral da conversa"
-}}"""
+{messages_context}"""
             },
             "sentiment": {
                 "system": """Você é um assistente especializado em análise de sentimento em conversas imobiliárias.
 Analise o sentimento geral da conversa e retorne um JSON com:
 - score: número de -1 a 1 (negativo a positivo)
 - sentiment: "positive", "neutral" ou "negative"
-- indicators: array de strings com indicadores que justificam o sentimento""",
+- indicators: array de strings com indicadores que justificam o sentimento
+Seja conciso: no máximo 3 indicadores curtos.""",
                 "user": f"""Analise o sentimento da seguinte conversa:
 
-{messages_context}
-
-Retorne APENAS um JSON válido com a estrutura:
-{{
-    "score": 0.8,
-    "sentiment": "positive",
-    "indicators": ["cliente demonstrou interesse", "perguntas específicas sobre a propriedade"]
-}}"""
+{messages_context}"""
             },
             "intent": {
                 "system": """Você é um assistente especializado em análise de intenção de compra em conversas imobiliárias.
@@ -103,18 +122,11 @@ Analise a intenção de compra do cliente e retorne um JSON com:
 - intent: "high", "medium" ou "low"
 - confidence: número de 0 a 1 (confiança na análise)
 - urgency: "high", "medium" ou "low"
-- reasons: array de strings com razões que justificam a intenção""",
+- reasons: array de strings com razões que justificam a intenção
+Seja conciso: no máximo 3 razões curtas.""",
                 "user": f"""Analise a intenção de compra na seguinte conversa:
 
-{messages_context}
-
-Retorne APENAS um JSON válido com a estrutura:
-{{
-    "intent": "high",
-    "confidence": 0.9,
-    "urgency": "high",
-    "reasons": ["cliente perguntou sobre visita", "demonstrou interesse imediato"]
-}}"""
+{messages_context}"""
             },
             "lead_quality": {
                 "system": """Você é um assistente especializado em qualificação de leads imobiliários.
@@ -122,18 +134,11 @@ Analise a qualidade do lead e retorne um JSON com:
 - quality: "hot", "warm" ou "cold"
 - score: número de 0 a 100
 - reasons: array de strings com razões da qualificação
-- follow_up_suggestions: array de strings com sugestões de follow-up""",
+- follow_up_suggestions: array de strings com sugestões de follow-up
+Seja conciso: no máximo 3 razões e 3 sugestões curtas.""",
                 "user": f"""Analise a qualidade do lead na seguinte conversa:
 
-{messages_context}
-
-Retorne APENAS um JSON válido com a estrutura:
-{{
-    "quality": "hot",
-    "score": 85,
-    "reasons": ["interesse demonstrado", "perguntas específicas", "disponibilidade para visita"],
-    "follow_up_suggestions": ["agendar visita", "enviar mais informações", "ligar em 24h"]
-}}"""
+{messages_context}"""
             }
         }
         
@@ -143,23 +148,91 @@ Retorne APENAS um JSON válido com a estrutura:
         
         return prompt_config["system"], prompt_config["user"]
     
+    async def _complete(
+        self,
+        model: str,
+        analysis_type: str,
+        system_prompt: str,
+        user_prompt: str,
+        timeout: float
+    ) -> Dict[str, Any]:
+        """
+        Executa uma chamada à OpenAI e valida o resultado
+        
+        Args:
+            model: Modelo a ser usado
+            analysis_type: Tipo de análise
+            system_prompt: Prompt de sistema
+            user_prompt: Prompt do usuário
+            timeout: Timeout da requisição em segundos
+            
+        Returns:
+            Dicionário com o resultado validado
+            
+        Raises:
+            ValueError: Se a resposta for recusada, truncada ou inválida
+            Exception: Em caso de erro na API
+        """
+        # Chama API OpenAI com saída estruturada: o SDK gera o JSON schema
+        # strict a partir do modelo do tipo de análise e valida a resposta
+        result_model = ANALYSIS_RESULT_MODELS[analysis_type]
+        try:
+            response = await self.client.beta.chat.completions.parse(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                response_format=result_model,
+                max_tokens=self.MAX_TOKENS[analysis_type],
+                temperature=self.TEMPERATURE,
+                timeout=timeout
+            )
+        except LengthFinishReasonError:
+            raise ValueError(
+                f"Resposta da OpenAI truncada (max_tokens={self.MAX_TOKENS[analysis_type]})"
+            )
+        except ContentFilterFinishReasonError:
+            raise ValueError("Resposta da OpenAI bloqueada pelo filtro de conteúdo")
+        except ValidationError as e:
+            logger.error(f"Erro ao validar resposta: {e}")
+            raise ValueError(f"Resposta inválida da OpenAI: {e}")
+        
+        message = response.choices[0].message
+        
+        if message.refusal:
+            raise ValueError(f"OpenAI recusou a análise: {message.refusal}")
+        
+        result = message.parsed
+        if result is None:
+            raise ValueError("Resposta vazia da OpenAI")
+        
+        return result.model_dump()
+    
     async def analyze(
         self, 
         messages: List[Message],
-        analysis_type: Literal["summary", "sentiment", "intent", "lead_quality"]
-    ) -> Dict[str, Any]:
+        analysis_type: Literal["summary", "sentiment", "intent", "lead_quality"],
+        on_attempt: Optional[Callable[[str], None]] = None
+    ) -> Tuple[Dict[str, Any], str]:
         """
         Realiza análise das mensagens usando OpenAI
         
+        O modelo é escolhido pelo ModelRouter (tipo de análise e tamanho da
+        conversa). Se a chamada ao modelo escolhido falhar com erro da API
+        (incluindo timeout), tenta uma vez no fallback. Havendo fallback, a
+        primeira chamada é cortada no SLO de latência da rota.
+        
         Args:
             messages: Lista de mensagens para análise
             analysis_type: Tipo de análise a ser realizada
+            on_attempt: Callback chamado com o modelo antes de cada chamada à API
             
         Returns:
-            Dicionário com o resultado da análise
+            Tupla (resultado validado pelo modelo do tipo, modelo usado)
             
         Raises:
-            ValueError: Se OpenAI não estiver configurado ou tipo inválido
+            ValueError: Se OpenAI não estiver configurado, tipo inválido ou resposta inválida
             Exception: Em caso de erro na API
         """
         if not self.client:
@@ -175,33 +248,54 @@ Retorne APENAS um JSON válido com a estrutura:
             # Obtém prompts
             system_prompt, user_prompt = self._get_prompts(analysis_type, messages_context)
             
-            logger.info(f"Iniciando análise do tipo: {analysis_type}")
+            # Escolhe o modelo
+            decision = self.router.select(analysis_type, system_prompt + user_prompt)
             
-            # Chama API OpenAI
-            response = self.client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.7
+            logger.info(
+                f"Iniciando análise do tipo: {analysis_type} "
+                f"(modelo {decision.model}, ~{decision.input_tokens} tokens)"
             )
             
-            # Extrai resposta
-            content = response.choices[0].message.content
+            candidates = [decision.model]
+            if decision.fallback:
+                candidates.append(decision.fallback)
+            
+            last_error: Optional[Exception] = None
+            for index, model in enumerate(candidates):
+                if index < len(candidates) - 1:
+                    # Ainda há fallback: não espera além do SLO
+                    timeout = min(
+                        settings.OPENAI_TIMEOUT_SECONDS,
+                        max(settings.OPENAI_MIN_TIMEOUT_SECONDS, decision.latency_slo_ms / 1000)
+                    )
+                else:
+                    timeout = settings.OPENAI_TIMEOUT_SECONDS
+                
+                if on_attempt:
+                    on_attempt(model)
+                started = time.monotonic()
+                try:
+                    result = await self._complete(
+                        model, analysis_type, system_prompt, user_prompt, timeout
+                    )
+                except APIError as e:
+                    # Só erros da API (inclui timeout e conexão) contam para a saúde
+                    # do modelo; recusa, truncamento e validação são propagados
+                    self.router.record_failure(model)
+                    logger.warning(f"Falha na análise com {model}: {e}")
+                    last_error = e
+                    continue
+                
+                latency_ms = (time.monotonic() - started) * 1000
+                self.router.record_success(model, latency_ms, decision.latency_slo_ms)
+                logger.info(
+                    f"Análise concluída com sucesso: {analysis_type} "
+                    f"({model}, {latency_ms:.0f}ms)"
+                )
+                return result, model
             
-            # Parse JSON
-            try:
-                result = json.loads(content)
-                logger.info(f"Análise concluída com sucesso: {analysis_type}")
-                return result
-            except json.JSONDecodeError as e:
-                logger.error(f"Erro ao fazer parse do JSON: {e}")
-                logger.error(f"Conteúdo recebido: {content}")
-                raise ValueError(f"Resposta inválida da OpenAI: {e}")
+            raise last_error
                 
         except Exception as e:
             logger.error(f"Erro ao analisar mensagens: {e}")
             raise
-
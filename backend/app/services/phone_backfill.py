@@ -0,0 +1,199 @@
+"""
+Backfill de conversations.phone_number a partir do histórico de mensagens
+Lê messages em páginas por keyset (conversation_id, message_id), extrai
+telefones num pool de processos e grava em lote, salvando um checkpoint a
+cada página. Cada conversa é gravada uma única vez, depois de lidas todas
+as suas mensagens.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from app.config import settings
+from app.services.phone_extractor import best_phone, extract_phones_batch, merge_phones
+
+logger = logging.getLogger(__name__)
+
+
+class PhoneBackfill:
+    """Extrai telefones de mensagens antigas e atualiza as conversas"""
+
+    def __init__(
+        self,
+        supabase_service,
+        chunk_size: Optional[int] = None,
+        workers: Optional[int] = None,
+        checkpoint_path: Optional[str] = None,
+        overwrite: bool = False
+    ):
+        """
+        Inicializa o backfill
+
+        Args:
+            supabase_service: Serviço Supabase
+            chunk_size: Mensagens por página (padrão: PHONE_BACKFILL_CHUNK_SIZE)
+            workers: Processos de extração (padrão: PHONE_BACKFILL_WORKERS)
+            checkpoint_path: Arquivo de checkpoint (padrão: PHONE_BACKFILL_CHECKPOINT)
+            overwrite: Se True, sobrescreve telefones já preenchidos
+        """
+        if not supabase_service or not supabase_service.client:
+            raise ValueError("Supabase não está configurado")
+
+        self.supabase_service = supabase_service
+        self.chunk_size = chunk_size or settings.PHONE_BACKFILL_CHUNK_SIZE
+        self.workers = workers or settings.PHONE_BACKFILL_WORKERS
+        self.checkpoint_path = checkpoint_path or settings.PHONE_BACKFILL_CHECKPOINT
+        self.overwrite = overwrite
+        self.state = self._load_checkpoint()
+
+    def _load_checkpoint(self) -> Dict[str, Any]:
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            logger.info(
+                f"Retomando backfill após conversa {state.get('last_conversation_id')} "
+                f"(message_id {state.get('last_message_id')})"
+            )
+            return state
+        return {
+            "last_conversation_id": None,
+            "last_message_id": None,
+            # Telefones já encontrados na conversa em que a última página parou
+            "pending_phones": [],
+            "messages_scanned": 0,
+            "conversations_updated": 0,
+            "done": False
+        }
+
+    def _save_checkpoint(self):
+        self.state["updated_at"] = datetime.now(timezone.utc).isoformat()
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def reset(self):
+        """Descarta o checkpoint e recomeça do início"""
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        self.state = self._load_checkpoint()
+
+    def _submit(self, pool: ProcessPoolExecutor, rows: List[Dict[str, Any]]) -> List[Awaitable]:
+        """Divide a página entre os workers"""
+        loop = asyncio.get_running_loop()
+        pairs: List[Tuple[str, str]] = [
+            (row["conversation_id"], row.get("content") or "") for row in rows
+        ]
+        size = max(1, -(-len(pairs) // self.workers))
+        return [
+            loop.run_in_executor(pool, extract_phones_batch, pairs[i:i + size])
+            for i in range(0, len(pairs), size)
+        ]
+
+    async def _write(self, found: Dict[str, List[str]]) -> int:
+        """Escolhe o melhor telefone de cada conversa e grava"""
+        phones = {cid: best_phone(numbers) for cid, numbers in found.items()}
+        return await self.supabase_service.update_phone_numbers(
+            {cid: p for cid, p in phones.items() if p},
+            overwrite=self.overwrite
+        )
+
+    async def _finish_page(
+        self,
+        last_conversation_id: str,
+        last_message_id: str,
+        count: int,
+        futures: List[Awaitable]
+    ):
+        """
+        Aguarda a extração de uma página, grava e salva o checkpoint
+
+        A última conversa da página pode continuar na página seguinte: os
+        telefones dela ficam no checkpoint (pending_phones) até que todas as
+        suas mensagens tenham sido lidas.
+        """
+        carry: Dict[str, List[str]] = {}
+        if self.state["last_conversation_id"] is not None:
+            carry = {self.state["last_conversation_id"]: self.state["pending_phones"]}
+        merged = merge_phones([carry] + await asyncio.gather(*futures))
+
+        pending = merged.pop(last_conversation_id, [])
+        updated = await self._write(merged)
+
+        self.state["last_conversation_id"] = last_conversation_id
+        self.state["last_message_id"] = last_message_id
+        self.state["pending_phones"] = pending
+        self.state["messages_scanned"] += count
+        self.state["conversations_updated"] += updated
+        self._save_checkpoint()
+
+    async def run(
+        self,
+        max_messages: Optional[int] = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Executa o backfill a partir do checkpoint
+
+        A página seguinte é buscada enquanto a anterior é processada no pool,
+        então no máximo duas páginas ficam em memória.
+
+        Args:
+            max_messages: Para após processar este número de mensagens (opcional)
+            on_progress: Callback chamado com o estado após cada página
+
+        Returns:
+            Estado final (última mensagem lida, mensagens lidas, conversas atualizadas)
+        """
+        started = time.monotonic()
+        scanned_at_start = self.state["messages_scanned"]
+        after = (self.state["last_conversation_id"], self.state["last_message_id"])
+        pending: Optional[Tuple[str, str, int, List[Awaitable]]] = None
+
+        logger.info(
+            f"Iniciando backfill de telefones (página {self.chunk_size}, "
+            f"{self.workers} workers, overwrite={self.overwrite})"
+        )
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            while True:
+                scanned = self.state["messages_scanned"] - scanned_at_start
+                if pending:
+                    scanned += pending[2]
+                limit_reached = max_messages is not None and scanned >= max_messages
+                rows = [] if limit_reached else await self.supabase_service.get_messages_page(
+                    *after, self.chunk_size
+                )
+
+                if pending:
+                    await self._finish_page(*pending)
+                    pending = None
+                    if on_progress:
+                        on_progress(self.state)
+
+                if not rows:
+                    if not limit_reached:
+                        # A última conversa não tem mais mensagens
+                        last_conversation_id = self.state["last_conversation_id"]
+                        if last_conversation_id is not None:
+                            self.state["conversations_updated"] += await self._write(
+                                {last_conversation_id: self.state["pending_phones"]}
+                            )
+                        self.state["pending_phones"] = []
+                        self.state["done"] = True
+                    self._save_checkpoint()
+                    break
+
+                after = (rows[-1]["conversation_id"], rows[-1]["message_id"])
+                pending = (*after, len(rows), self._submit(pool, rows))
+
+        elapsed = time.monotonic() - started
+        logger.info(
+            f"Backfill concluído: {self.state['messages_scanned'] - scanned_at_start} mensagens, "
+            f"{self.state['conversations_updated']} conversas atualizadas em {elapsed:.1f}s"
+        )
+        return self.state
@@ -0,0 +1,181 @@
+"""
+Extração de números de telefone de mensagens
+Padrões portugueses e internacionais, normalizados para E.164 (+351912345678)
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+PT_COUNTRY_CODE = "351"
+
+# Separadores aceitos entre dígitos
+_SEP = r"[\s.\-]?"
+
+# Número português: 9 dígitos começando por 2 ou 9, em qualquer agrupamento
+# (912 345 678, 91 234 56 78, 21 234 5678...), com prefixo +351 / 00351
+# opcional. Não pode continuar outra sequência de dígitos (ex.: o final de
+# "+55 11 91234 5678"); o plano de numeração é validado em normalize_phone.
+PT_PHONE_RE = re.compile(
+    rf"(?<![\d+])(?<!\d[\s.\-])(?:(?:\+|00)\s?351{_SEP})?"
+    rf"[29](?:{_SEP}\d){{8}}(?!\d)"
+)
+
+# Número internacional com prefixo + ou 00 (E.164: até 15 dígitos)
+INTL_PHONE_RE = re.compile(
+    rf"(?<![\d+])(?:\+|00)\s?([1-9](?:\d{_SEP}){{6,13}}\d)(?!\d)"
+)
+
+# Plano de numeração português: fixos 21-29, móveis 91, 92, 93 e 96
+PT_NATIONAL_RE = re.compile(r"^(?:2[1-9]|9[1236])\d{7}$")
+
+# Móveis portugueses (91, 92, 93, 96)
+PT_MOBILE_RE = re.compile(r"^\+3519[1236]\d{7}$")
+
+# Contextos em que a sequência é NIF/NIPC ou valor, não telefone
+# (ex.: "NIF 234567890", "contribuinte nº 234567890", "€ 250.000.000")
+_EXCLUDED_BEFORE_RE = re.compile(
+    r"(?:\b(?:nif|nipc|contribuinte)\b|€)[\s:.\-#nº°]*$",
+    re.IGNORECASE
+)
+_EXCLUDED_AFTER_RE = re.compile(r"^\s*€")
+
+_NON_DIGIT_RE = re.compile(r"\D")
+
+
+def normalize_phone(raw: str) -> Optional[str]:
+    """
+    Normaliza um número para E.164
+
+    Números de 9 dígitos sem prefixo são considerados portugueses.
+
+    Args:
+        raw: Número como aparece no texto (ex.: "912 345 678", "+44 20 7946 0958")
+
+    Returns:
+        Número normalizado (ex.: "+351912345678") ou None se inválido
+    """
+    has_prefix = raw.strip().startswith(("+", "00"))
+    digits = _NON_DIGIT_RE.sub("", raw)
+    if raw.strip().startswith("00"):
+        digits = digits[2:]
+
+    if not has_prefix:
+        if PT_NATIONAL_RE.match(digits):
+            return f"+{PT_COUNTRY_CODE}{digits}"
+        return None
+
+    if digits.startswith(PT_COUNTRY_CODE):
+        if PT_NATIONAL_RE.match(digits[len(PT_COUNTRY_CODE):]):
+            return f"+{digits}"
+        return None
+
+    if 8 <= len(digits) <= 15:
+        return f"+{digits}"
+    return None
+
+
+def _is_excluded(text: str, start: int, end: int) -> bool:
+    """Indica se o número está num contexto de NIF/NIPC ou de valor em euros"""
+    return bool(
+        _EXCLUDED_BEFORE_RE.search(text[max(0, start - 30):start])
+        or _EXCLUDED_AFTER_RE.match(text[end:end + 5])
+    )
+
+
+def extract_phones(text: str) -> List[str]:
+    """
+    Extrai números de telefone de um texto
+
+    Args:
+        text: Conteúdo da mensagem
+
+    Returns:
+        Números normalizados, sem repetição, na ordem em que aparecem
+    """
+    if not text:
+        return []
+
+    found: List[Tuple[int, str]] = []
+    taken: List[Tuple[int, int]] = []
+
+    for match in PT_PHONE_RE.finditer(text):
+        if _is_excluded(text, *match.span()):
+            taken.append(match.span())
+            continue
+        phone = normalize_phone(match.group(0))
+        if phone:
+            found.append((match.start(), phone))
+            taken.append(match.span())
+
+    for match in INTL_PHONE_RE.finditer(text):
+        start, end = match.span()
+        if any(start < t_end and t_start < end for t_start, t_end in taken):
+            continue
+        if _is_excluded(text, start, end):
+            continue
+        phone = normalize_phone(match.group(0))
+        if phone:
+            found.append((start, phone))
+
+    phones: List[str] = []
+    for _, phone in sorted(found):
+        if phone not in phones:
+            phones.append(phone)
+    return phones
+
+
+def best_phone(phones: List[str]) -> Optional[str]:
+    """
+    Escolhe o número mais provável de ser o contato do cliente
+
+    Args:
+        phones: Números normalizados
+
+    Returns:
+        Primeiro móvel português, ou o primeiro número, ou None
+    """
+    for phone in phones:
+        if PT_MOBILE_RE.match(phone):
+            return phone
+    return phones[0] if phones else None
+
+
+def extract_phones_batch(rows: List[Tuple[str, str]]) -> Dict[str, List[str]]:
+    """
+    Extrai telefones de um lote de mensagens (executado nos workers)
+
+    Args:
+        rows: Lista de tuplas (conversation_id, content)
+
+    Returns:
+        Dicionário conversation_id -> números encontrados
+    """
+    results: Dict[str, List[str]] = {}
+    for conversation_id, content in rows:
+        phones = extract_phones(content)
+        if not phones:
+            continue
+        current = results.setdefault(conversation_id, [])
+        for phone in phones:
+            if phone not in current:
+                current.append(phone)
+    return results
+
+
+def merge_phones(results: List[Dict[str, List[str]]]) -> Dict[str, List[str]]:
+    """
+    Junta os resultados de vários lotes, mantendo a ordem das mensagens
+
+    Args:
+        results: Resultados de extract_phones_batch, na ordem dos lotes
+
+    Returns:
+        Dicionário conversation_id -> números encontrados, sem repetição
+    """
+    merged: Dict[str, List[str]] = {}
+    for result in results:
+        for conversation_id, phones in result.items():
+            current = merged.setdefault(conversation_id, [])
+            for phone in phones:
+                if phone not in current:
+                    current.append(phone)
+    return merged
@@ -0,0 +1,93 @@
+"""
+Cache em memória das configurações (general_settings e agent_ia_settings)
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Dict, Any, Optional
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Campos que nunca são expostos pela API
+SECRET_FIELDS = {"openai_key"}
+
+
+class SettingsCache:
+    """Mantém as configurações em memória com ETag e invalidação"""
+
+    def __init__(self, supabase_service):
+        """
+        Inicializa o cache
+
+        Args:
+            supabase_service: Serviço Supabase usado para carregar as tabelas
+        """
+        self.supabase_service = supabase_service
+        self.ttl_seconds = settings.SETTINGS_CACHE_TTL_SECONDS
+        self._payload: Optional[Dict[str, Any]] = None
+        self._etag: Optional[str] = None
+        self._loaded_at: float = 0.0
+        self._lock = asyncio.Lock()
+        # Incrementado a cada invalidação; uma carga iniciada antes dela é descartada
+        self._generation: int = 0
+
+    @staticmethod
+    def _public_agent_ia_settings(row: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Remove campos secretos, indicando apenas se estão configurados"""
+        if row is None:
+            return None
+        public = {key: value for key, value in row.items() if key not in SECRET_FIELDS}
+        public["openai_key_configured"] = bool(row.get("openai_key"))
+        return public
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._payload is not None
+            and time.monotonic() - self._loaded_at < self.ttl_seconds
+        )
+
+    async def _load(self):
+        generation = self._generation
+        general = await self.supabase_service.get_single_row("general_settings")
+        agent_ia = await self.supabase_service.get_single_row("agent_ia_settings")
+
+        payload = {
+            "general_settings": general,
+            "agent_ia_settings": self._public_agent_ia_settings(agent_ia)
+        }
+        body = json.dumps(payload, sort_keys=True, default=str)
+
+        if generation != self._generation:
+            # Invalidado durante a leitura: as linhas lidas podem estar desatualizadas
+            logger.info("Configurações alteradas durante a carga; recarregando")
+            return
+
+        self._payload = payload
+        self._etag = f'"{hashlib.sha256(body.encode("utf-8")).hexdigest()[:32]}"'
+        self._loaded_at = time.monotonic()
+        logger.info(f"Configurações carregadas no cache (ETag {self._etag})")
+
+    async def get(self) -> tuple[Dict[str, Any], str]:
+        """
+        Retorna as configurações e o ETag, recarregando se o cache expirou
+
+        Returns:
+            Tupla (configurações, ETag)
+        """
+        if not self._is_fresh():
+            async with self._lock:
+                # Outra requisição pode ter recarregado enquanto aguardava
+                while not self._is_fresh():
+                    await self._load()
+        return self._payload, self._etag
+
+    def invalidate(self):
+        """Descarta o cache; a próxima leitura recarrega do banco"""
+        self._generation += 1
+        self._payload = None
+        self._etag = None
+        self._loaded_at = 0.0
+        logger.info("Cache de configurações invalidado")
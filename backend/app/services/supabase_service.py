@@ -1,6 +1,7 @@
 """
 Serviço de integração com Supabase
 """
+import asyncio
 import logging
 from typing import List, Dict, Any, Optional
 from supabase import create_client, Client
@@ -13,6 +14,9 @@ logger = logging.getLogger(__name__)
 class SupabaseService:
     """Serviço para interação com Supabase"""
     
+    # Conversas por consulta no filtro in_() (limita o tamanho da URL)
+    FILTER_BATCH_SIZE: int = 200
+    
     def __init__(self):
         """Inicializa o serviço Supabase"""
         if not settings.is_supabase_configured:
@@ -26,6 +30,21 @@ class SupabaseService:
                 logger.error(f"Erro ao inicializar Supabase: {e}")
                 self.client = None
     
+    async def _execute(self, query):
+        """
+        Executa uma query do Supabase numa thread
+        
+        O client do Supabase é síncrono; rodar fora do event loop evita que
+        consultas lentas travem as outras requisições.
+        
+        Args:
+            query: Query montada (ainda não executada)
+            
+        Returns:
+            Resposta da query
+        """
+        return await asyncio.to_thread(query.execute)
+    
     async def get_messages(self, conversation_id: str) -> List[Message]:
         """
         Busca mensagens de uma conversa
@@ -46,11 +65,11 @@ class SupabaseService:
         try:
             logger.info(f"Buscando mensagens da conversa: {conversation_id}")
             
-            response = self.client.table("messages")\
+            query = self.client.table("messages")\
                 .select("*")\
                 .eq("conversation_id", conversation_id)\
-                .order("timestamp", desc=False)\
-                .execute()
+                .order("timestamp", desc=False)
+            response = await self._execute(query)
             
             messages = []
             for row in response.data:
@@ -76,11 +95,70 @@ class SupabaseService:
             logger.error(f"Erro ao buscar mensagens: {e}")
             raise
     
+    async def get_conversations_changed_since(
+        self,
+        since: str,
+        limit: int = 500
+    ) -> List[Dict[str, Any]]:
+        """
+        Busca conversas que receberam mensagens novas desde um instante
+        
+        Usa last_ingested_at (quando a mensagem foi gravada, mantido por
+        trigger) e não last_message_date (quando foi enviada), para não
+        perder mensagens capturadas com atraso.
+        
+        Args:
+            since: Timestamp ISO; retorna conversas com last_ingested_at posterior
+            limit: Número máximo de conversas
+            
+        Returns:
+            Lista de conversas (conversation_id, last_message_date, has_unread,
+            last_ingested_at)
+            
+        Raises:
+            ValueError: Se Supabase não estiver configurado
+        """
+        if not self.client:
+            raise ValueError("Supabase não está configurado")
+        
+        query = self.client.table("conversations")\
+            .select("conversation_id,last_message_date,has_unread,last_ingested_at")\
+            .gt("last_ingested_at", since)\
+            .order("last_ingested_at", desc=False)\
+            .limit(limit)
+        response = await self._execute(query)
+        
+        return response.data or []
+    
+    async def get_analyses(self, conversation_id: str) -> List[Dict[str, Any]]:
+        """
+        Busca as análises salvas de uma conversa
+        
+        Args:
+            conversation_id: ID da conversa
+            
+        Returns:
+            Lista de análises (uma por tipo)
+            
+        Raises:
+            ValueError: Se Supabase não estiver configurado
+        """
+        if not self.client:
+            raise ValueError("Supabase não está configurado")
+        
+        query = self.client.table("message_analyses")\
+            .select("analysis_type,result,model,updated_at")\
+            .eq("conversation_id", conversation_id)
+        response = await self._execute(query)
+        
+        return response.data or []
+    
     async def save_analysis(
         self, 
         conversation_id: str, 
         analysis_type: str, 
-        result: Dict[str, Any]
+        result: Dict[str, Any],
+        model: Optional[str] = None
     ) -> bool:
         """
         Salva resultado da análise no banco de dados
@@ -89,6 +167,7 @@ class SupabaseService:
             conversation_id: ID da conversa
             analysis_type: Tipo de análise
             result: Resultado da análise
+            model: Modelo OpenAI usado na análise
             
         Returns:
             True se salvou com sucesso, False caso contrário
@@ -103,32 +182,34 @@ class SupabaseService:
             logger.info(f"Salvando análise {analysis_type} para conversa {conversation_id}")
             
             # Verifica se já existe uma análise deste tipo
-            existing = self.client.table("message_analyses")\
+            query = self.client.table("message_analyses")\
                 .select("id")\
                 .eq("conversation_id", conversation_id)\
-                .eq("analysis_type", analysis_type)\
-                .execute()
+                .eq("analysis_type", analysis_type)
+            existing = await self._execute(query)
             
             if existing.data:
                 # Atualiza existente
-                self.client.table("message_analyses")\
+                query = self.client.table("message_analyses")\
                     .update({
                         "result": result,
+                        "model": model,
                         "updated_at": "now()"
                     })\
                     .eq("conversation_id", conversation_id)\
-                    .eq("analysis_type", analysis_type)\
-                    .execute()
+                    .eq("analysis_type", analysis_type)
+                await self._execute(query)
                 logger.info("Análise atualizada")
             else:
                 # Cria nova
-                self.client.table("message_analyses")\
+                query = self.client.table("message_analyses")\
                     .insert({
                         "conversation_id": conversation_id,
                         "analysis_type": analysis_type,
-                        "result": result
-                    })\
-                    .execute()
+                        "result": result,
+                        "model": model
+                    })
+                await self._execute(query)
                 logger.info("Análise criada")
             
             return True
@@ -137,3 +218,164 @@ class SupabaseService:
             logger.error(f"Erro ao salvar análise: {e}")
             return False
 
+    
+    async def get_single_row(self, table: str) -> Optional[Dict[str, Any]]:
+        """
+        Busca a única linha de uma tabela de configuração
+        
+        Args:
+            table: Nome da tabela (general_settings ou agent_ia_settings)
+            
+        Returns:
+            Linha encontrada ou None
+            
+        Raises:
+            ValueError: Se Supabase não estiver configurado
+        """
+        if not self.client:
+            raise ValueError("Supabase não está configurado")
+        
+        query = self.client.table(table)\
+            .select("*")\
+            .limit(1)
+        response = await self._execute(query)
+        
+        return response.data[0] if response.data else None
+    
+    async def update_single_row(self, table: str, updates: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Atualiza (ou cria) a única linha de uma tabela de configuração
+        
+        Args:
+            table: Nome da tabela (general_settings ou agent_ia_settings)
+            updates: Campos a atualizar
+            
+        Returns:
+            Linha atualizada
+            
+        Raises:
+            ValueError: Se Supabase não estiver configurado
+        """
+        if not self.client:
+            raise ValueError("Supabase não está configurado")
+        
+        logger.info(f"Atualizando {table}: {sorted(updates.keys())}")
+        
+        existing = await self.get_single_row(table)
+        if existing:
+            query = self.client.table(table)\
+                .update(updates)\
+                .eq("id", existing["id"])
+            response = await self._execute(query)
+        else:
+            query = self.client.table(table)\
+                .insert(updates)
+            response = await self._execute(query)
+        
+        return response.data[0] if response.data else {}
+    
+    async def get_messages_page(
+        self,
+        after_conversation_id: Optional[str],
+        after_message_id: Optional[str],
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Busca uma página de mensagens que não são do agente
+        
+        Keyset por (conversation_id, message_id): as mensagens de uma conversa
+        vêm juntas, na ordem de message_id. Como o client não monta filtros
+        "or", a página é lida em duas consultas: o resto da conversa em que a
+        anterior parou e, se sobrar espaço, as conversas seguintes.
+        
+        Args:
+            after_conversation_id: Conversa da última mensagem da página anterior
+                (None na primeira)
+            after_message_id: Último message_id da página anterior
+            limit: Número máximo de mensagens
+            
+        Returns:
+            Lista de mensagens (message_id, conversation_id, content)
+            
+        Raises:
+            ValueError: Se Supabase não estiver configurado
+        """
+        if not self.client:
+            raise ValueError("Supabase não está configurado")
+        
+        rows: List[Dict[str, Any]] = []
+        
+        if after_conversation_id is not None:
+            query = self.client.table("messages")\
+                .select("message_id,conversation_id,content")\
+                .neq("sender", "agent")\
+                .eq("conversation_id", after_conversation_id)\
+                .gt("message_id", after_message_id)\
+                .order("message_id", desc=False)\
+                .limit(limit)
+            response = await self._execute(query)
+            rows.extend(response.data or [])
+        
+        if len(rows) < limit:
+            query = self.client.table("messages")\
+                .select("message_id,conversation_id,content")\
+                .neq("sender", "agent")\
+                .order("conversation_id.asc,message_id", desc=False)\
+                .limit(limit - len(rows))
+            if after_conversation_id is not None:
+                query = query.gt("conversation_id", after_conversation_id)
+            response = await self._execute(query)
+            rows.extend(response.data or [])
+        
+        return rows
+    
+    async def update_phone_numbers(self, phones: Dict[str, str], overwrite: bool = False) -> int:
+        """
+        Grava telefones nas conversas com um upsert em lote
+        
+        Sem overwrite, só conversas com phone_number vazio são atualizadas.
+        
+        Args:
+            phones: Dicionário conversation_id -> telefone normalizado
+            overwrite: Se True, sobrescreve telefones já preenchidos
+            
+        Returns:
+            Número de conversas atualizadas
+            
+        Raises:
+            ValueError: Se Supabase não estiver configurado
+        """
+        if not self.client:
+            raise ValueError("Supabase não está configurado")
+        
+        if not phones:
+            return 0
+        
+        conversation_ids = list(phones.keys())
+        if not overwrite:
+            # Só preenche conversas sem telefone
+            missing: List[str] = []
+            for i in range(0, len(conversation_ids), self.FILTER_BATCH_SIZE):
+                query = self.client.table("conversations")\
+                    .select("conversation_id")\
+                    .in_("conversation_id", conversation_ids[i:i + self.FILTER_BATCH_SIZE])\
+                    .is_("phone_number", "null")
+                response = await self._execute(query)
+                missing.extend(row["conversation_id"] for row in response.data or [])
+            conversation_ids = missing
+        
+        if not conversation_ids:
+            return 0
+        
+        query = self.client.table("conversations")\
+            .upsert(
+                [
+                    {"conversation_id": cid, "phone_number": phones[cid]}
+                    for cid in conversation_ids
+                ],
+                on_conflict="conversation_id"
+            )
+        await self._execute(query)
+        
+        logger.info(f"Telefone gravado em {len(conversation_ids)} conversas")
+        return len(conversation_ids)
@@ -0,0 +1,74 @@
+"""
+Script para preencher conversations.phone_number a partir do histórico de mensagens
+Retoma do checkpoint se for interrompido (Ctrl+C)
+"""
+import argparse
+import asyncio
+import logging
+import sys
+
+try:
+    from app.config import settings
+    from app.services.supabase_service import SupabaseService
+    from app.services.phone_backfill import PhoneBackfill
+except ImportError as e:
+    print(f"❌ Erro ao importar dependências: {e}")
+    print("   Execute: pip install -r requirements.txt")
+    sys.exit(1)
+
+
+def main():
+    """Executa o backfill de telefones"""
+    parser = argparse.ArgumentParser(description="Backfill de telefones das conversas")
+    parser.add_argument("--chunk-size", type=int, default=settings.PHONE_BACKFILL_CHUNK_SIZE,
+                        help="Mensagens por página")
+    parser.add_argument("--workers", type=int, default=settings.PHONE_BACKFILL_WORKERS,
+                        help="Processos de extração")
+    parser.add_argument("--checkpoint", default=settings.PHONE_BACKFILL_CHECKPOINT,
+                        help="Arquivo de checkpoint")
+    parser.add_argument("--max-messages", type=int, default=None,
+                        help="Para após este número de mensagens")
+    parser.add_argument("--overwrite", action="store_true",
+                        help="Sobrescreve telefones já preenchidos")
+    parser.add_argument("--reset", action="store_true",
+                        help="Descarta o checkpoint e recomeça do início")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+
+    if not settings.is_supabase_configured:
+        print("❌ Supabase não está configurado (SUPABASE_URL e SUPABASE_KEY no .env)")
+        sys.exit(1)
+
+    backfill = PhoneBackfill(
+        SupabaseService(),
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        checkpoint_path=args.checkpoint,
+        overwrite=args.overwrite
+    )
+    if args.reset:
+        backfill.reset()
+
+    def on_progress(state):
+        print(
+            f"📞 {state['messages_scanned']} mensagens lidas, "
+            f"{state['conversations_updated']} conversas atualizadas "
+            f"(última conversa: {state['last_conversation_id']})"
+        )
+
+    try:
+        state = asyncio.run(backfill.run(max_messages=args.max_messages, on_progress=on_progress))
+    except KeyboardInterrupt:
+        print(f"\n⏸️  Interrompido. Execute novamente para retomar do checkpoint ({args.checkpoint})")
+        sys.exit(130)
+
+    status = "concluído" if state["done"] else "pausado (limite atingido)"
+    print(f"\n✨ Backfill {status}: {state['conversations_updated']} conversas atualizadas")
+
+
+if __name__ == "__main__":
+    main()
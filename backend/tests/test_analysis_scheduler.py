@@ -0,0 +1,127 @@
+"""
+Testes do agendador de reanálise automática
+"""
+import asyncio
+import json
+import httpx
+import pytest
+from app.config import settings
+from app.models import Message
+from app.services.analysis_scheduler import AnalysisScheduler
+from app.services.model_router import ModelRouter
+from app.services.openai_service import OpenAIService
+
+
+class FakeSupabase:
+    """Supabase falso que devolve as conversas alteradas após o watermark"""
+
+    def __init__(self, conversations=None):
+        self.conversations = conversations or []
+        self.saved = []
+
+    async def get_conversations_changed_since(self, since, limit=500):
+        return [c for c in self.conversations if c["last_ingested_at"] > since]
+
+    async def get_messages(self, conversation_id):
+        return [Message(message_id="m1", conversation_id=conversation_id, content="Olá",
+                        timestamp="2024-01-15T10:00:00Z", sender="client")]
+
+    async def save_analysis(self, **kwargs):
+        self.saved.append(kwargs)
+        return True
+
+
+def test_late_scraped_message_is_picked_up_after_watermark_advanced():
+    supabase = FakeSupabase([{
+        "conversation_id": "recente",
+        "last_message_date": "2030-01-02T10:00:00+00:00",
+        "has_unread": False,
+        "last_ingested_at": "2030-01-02T10:00:05+00:00"
+    }])
+    scheduler = AnalysisScheduler(openai_service=None, supabase_service=supabase)
+    scheduler._watermark = "2030-01-01T00:00:00+00:00"
+
+    asyncio.run(scheduler._poll_changes())
+    assert scheduler._watermark == "2030-01-02T10:00:05+00:00"
+
+    # Mensagem enviada há dias, mas gravada agora (extensão estava fechada)
+    supabase.conversations.append({
+        "conversation_id": "atrasada",
+        "last_message_date": "2029-12-28T09:00:00+00:00",
+        "has_unread": True,
+        "last_ingested_at": "2030-01-02T10:01:00+00:00"
+    })
+    asyncio.run(scheduler._poll_changes())
+
+    assert "atrasada" in scheduler._pending
+
+
+class FakeOpenAI:
+    """OpenAI falso em que toda análise usa o fallback (2 chamadas)"""
+    MAX_ATTEMPTS_PER_ANALYSIS = 2
+
+    def __init__(self):
+        self.requests = 0
+
+    async def analyze(self, messages, analysis_type, on_attempt=None):
+        on_attempt("primary")
+        on_attempt("fallback")
+        self.requests += 2
+        return {"ok": True}, "fallback"
+
+
+LEAD_QUALITY = '{"quality": "warm", "score": 60, "reasons": ["ok"], "follow_up_suggestions": []}'
+
+
+class SDKOpenAI(OpenAIService):
+    """OpenAIService com o SDK real; o modelo primário responde 500 (que o SDK repetiria)"""
+
+    def __init__(self):
+        self.requests = 0
+
+        def handler(request):
+            self.requests += 1
+            model = json.loads(request.content)["model"]
+            if model == "primary":
+                return httpx.Response(500, json={"error": {"message": "erro"}})
+            return httpx.Response(200, json={
+                "id": "chatcmpl-1",
+                "object": "chat.completion",
+                "created": 0,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": LEAD_QUALITY, "refusal": None},
+                    "finish_reason": "stop",
+                    "logprobs": None,
+                }],
+            })
+
+        super().__init__(http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        self.router = ModelRouter(routes=[{
+            "analysis_types": "*", "max_input_tokens": None,
+            "model": "primary", "fallback": "fallback", "latency_slo_ms": 60000
+        }])
+
+
+@pytest.mark.parametrize("openai_class", [FakeOpenAI, SDKOpenAI])
+def test_budget_is_charged_for_fallback_attempts(monkeypatch, openai_class):
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "sk-test")
+    openai_service = openai_class()
+    supabase = FakeSupabase()
+    scheduler = AnalysisScheduler(openai_service=openai_service, supabase_service=supabase)
+    scheduler.analysis_types = ["lead_quality"]
+    scheduler.max_calls_per_hour = 3
+
+    scheduler.notify("c1")
+    scheduler.notify("c2")
+    for job in scheduler._pending.values():
+        job.due_at = 0
+
+    ran = [asyncio.run(scheduler._run_job(job)) for job in scheduler._due_jobs()]
+
+    assert ran == [True, False]
+    assert scheduler.get_status()["calls_last_hour"] == 2
+    # Cada chamada descontada é uma única requisição HTTP (sem retries do SDK)
+    assert openai_service.requests == 2
+    assert len(supabase.saved) == 1
@@ -0,0 +1,125 @@
+"""
+Testes do fallback de modelos no OpenAIService
+"""
+import asyncio
+import json
+import httpx
+import pytest
+from app.config import settings
+from app.models import Message
+from app.services.model_router import ModelRouter
+from app.services.openai_service import OpenAIService
+
+ROUTES = [{"analysis_types": "*", "max_input_tokens": None,
+           "model": "primary", "fallback": "fallback", "latency_slo_ms": 60000}]
+
+MESSAGES = [Message(message_id="m1", conversation_id="c1", content="Olá",
+                    timestamp="2024-01-15T10:00:00Z", sender="client")]
+
+SENTIMENT = '{"score": 0.5, "sentiment": "positive", "indicators": ["ok"]}'
+
+
+def _completion(model, content, finish_reason="stop", refusal=None):
+    """Corpo de resposta da API de chat completions"""
+    return {
+        "id": "chatcmpl-1",
+        "object": "chat.completion",
+        "created": 0,
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content, "refusal": refusal},
+            "finish_reason": finish_reason,
+            "logprobs": None,
+        }],
+    }
+
+
+def _service(monkeypatch, outcomes, routes=ROUTES):
+    """
+    OpenAIService com o SDK real sobre um transporte HTTP falso
+
+    Cada requisição consome o próximo resultado: uma exceção do httpx ou
+    um dicionário (content, finish_reason, refusal) para a resposta.
+    """
+    requests = []
+
+    def handler(request):
+        model = json.loads(request.content)["model"]
+        requests.append((model, request.extensions["timeout"]["read"]))
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return httpx.Response(200, json=_completion(model, **outcome))
+
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "sk-test")
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    service = OpenAIService(http_client=http_client)
+    service.router = ModelRouter(routes=routes)
+    return service, requests
+
+
+def _timeout():
+    return httpx.ReadTimeout("timeout", request=httpx.Request("POST", "https://api"))
+
+
+def test_api_error_retries_on_fallback(monkeypatch):
+    service, requests = _service(monkeypatch, [_timeout(), {"content": SENTIMENT}])
+
+    result, model = asyncio.run(service.analyze(MESSAGES, "sentiment"))
+
+    assert [model for model, _ in requests] == ["primary", "fallback"]
+    assert model == "fallback"
+    assert result["sentiment"] == "positive"
+    assert service.router.get_stats()["models"]["primary"]["errors"] == 1
+
+
+def test_truncated_response_is_not_retried(monkeypatch):
+    service, requests = _service(
+        monkeypatch, [{"content": '{"score": 0.5', "finish_reason": "length"}]
+    )
+
+    with pytest.raises(ValueError):
+        asyncio.run(service.analyze(MESSAGES, "sentiment"))
+
+    assert [model for model, _ in requests] == ["primary"]
+    assert service.router.get_stats()["models"]["primary"]["errors"] == 0
+
+
+def test_invalid_response_is_not_retried(monkeypatch):
+    service, requests = _service(
+        monkeypatch, [{"content": '{"score": 5, "sentiment": "x", "indicators": []}'}]
+    )
+
+    with pytest.raises(ValueError):
+        asyncio.run(service.analyze(MESSAGES, "sentiment"))
+
+    assert [model for model, _ in requests] == ["primary"]
+
+
+def test_refusal_is_not_retried(monkeypatch):
+    service, requests = _service(
+        monkeypatch, [{"content": None, "refusal": "Não posso ajudar com isso."}]
+    )
+
+    with pytest.raises(ValueError, match="recusou"):
+        asyncio.run(service.analyze(MESSAGES, "sentiment"))
+
+    assert [model for model, _ in requests] == ["primary"]
+
+
+def test_primary_timeout_sends_one_request_before_fallback(monkeypatch):
+    routes = [dict(ROUTES[0], latency_slo_ms=3000)]
+    service, requests = _service(
+        monkeypatch, [_timeout(), {"content": SENTIMENT}], routes=routes
+    )
+
+    result, model = asyncio.run(service.analyze(MESSAGES, "sentiment"))
+
+    assert model == "fallback"
+    assert result["sentiment"] == "positive"
+    # Sem retries do SDK; o modelo escolhido é cortado no SLO da rota
+    assert requests == [
+        ("primary", 3.0),
+        ("fallback", settings.OPENAI_TIMEOUT_SECONDS),
+    ]
@@ -0,0 +1,63 @@
+"""
+Testes do formato de saída estruturada do OpenAIService
+"""
+import asyncio
+import json
+import httpx
+from app.config import settings
+from app.models import ANALYSIS_RESULT_MODELS, Message
+from app.services.openai_service import OpenAIService
+
+MESSAGES = [Message(message_id="m1", conversation_id="c1", content="Olá",
+                    timestamp="2024-01-15T10:00:00Z", sender="client")]
+
+
+def _walk(node):
+    if isinstance(node, dict):
+        yield node
+        for value in node.values():
+            yield from _walk(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _walk(item)
+
+
+def _sent_response_format(monkeypatch, analysis_type):
+    """Envia uma análise pelo SDK e retorna o response_format da requisição"""
+    sent = []
+
+    def handler(request):
+        sent.append(json.loads(request.content)["response_format"])
+        return httpx.Response(500, json={"error": {"message": "erro"}})
+
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "sk-test")
+    service = OpenAIService(http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    try:
+        asyncio.run(service.analyze(MESSAGES, analysis_type))
+    except Exception:
+        pass
+    return sent[0]
+
+
+def test_response_format_is_strict_for_every_analysis_type(monkeypatch):
+    for analysis_type in ANALYSIS_RESULT_MODELS:
+        response_format = _sent_response_format(monkeypatch, analysis_type)
+        schema = response_format["json_schema"]["schema"]
+
+        assert response_format["type"] == "json_schema"
+        assert response_format["json_schema"]["strict"] is True
+        assert "allOf" not in json.dumps(schema)
+        for node in _walk(schema):
+            if node.get("type") == "object":
+                assert node["additionalProperties"] is False
+                assert node["required"] == list(node["properties"].keys())
+            if "$ref" in node:
+                assert set(node) == {"$ref"}
+
+
+def test_summary_key_info_is_inlined_object(monkeypatch):
+    schema = _sent_response_format(monkeypatch, "summary")["json_schema"]["schema"]
+    key_info = schema["properties"]["key_info"]
+
+    assert key_info["type"] == "object"
+    assert set(key_info["properties"]) == {"cliente", "propriedade", "interesse", "contato"}
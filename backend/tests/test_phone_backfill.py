@@ -0,0 +1,103 @@
+"""
+Testes do backfill de telefones
+"""
+import asyncio
+from types import SimpleNamespace
+from app.services.phone_backfill import PhoneBackfill
+
+
+class FakeSupabase:
+    """Supabase falso com mensagens em memória e keyset por (conversation_id, message_id)"""
+
+    def __init__(self, messages, phones=None):
+        self.client = SimpleNamespace()
+        self.messages = sorted(messages, key=lambda m: (m["conversation_id"], m["message_id"]))
+        self.phones = dict(phones or {})
+        self.writes = []
+
+    async def get_messages_page(self, after_conversation_id, after_message_id, limit):
+        after = (after_conversation_id or "", after_message_id or "")
+        rows = [
+            m for m in self.messages
+            if (m["conversation_id"], m["message_id"]) > after
+        ]
+        return rows[:limit]
+
+    async def update_phone_numbers(self, phones, overwrite=False):
+        targets = [cid for cid in phones if overwrite or not self.phones.get(cid)]
+        for cid in targets:
+            self.writes.append(cid)
+            self.phones[cid] = phones[cid]
+        return len(targets)
+
+
+def _message(conversation_id, message_id, content):
+    return {"conversation_id": conversation_id, "message_id": message_id, "content": content}
+
+
+MESSAGES = [
+    _message("c1", "m1", "fixo 21 234 5678"),
+    _message("c1", "m2", "olá"),
+    _message("c1", "m3", "móvel 91 234 56 78"),
+    _message("c2", "m1", "+44 20 7946 0958"),
+    _message("c3", "m1", "sem telefone"),
+]
+
+
+def _run(supabase, tmp_path, **kwargs):
+    backfill = PhoneBackfill(
+        supabase,
+        chunk_size=2,
+        workers=1,
+        checkpoint_path=str(tmp_path / "checkpoint.json"),
+        **kwargs
+    )
+    return asyncio.run(backfill.run())
+
+
+def test_best_phone_considers_the_whole_conversation_across_pages(tmp_path):
+    supabase = FakeSupabase(MESSAGES)
+
+    state = _run(supabase, tmp_path)
+
+    assert state["done"] is True
+    assert state["messages_scanned"] == len(MESSAGES)
+    assert supabase.phones == {"c1": "+351912345678", "c2": "+442079460958"}
+    assert sorted(supabase.writes) == ["c1", "c2"]
+    assert state["conversations_updated"] == 2
+
+
+def test_overwrite_writes_each_conversation_once(tmp_path):
+    supabase = FakeSupabase(MESSAGES, phones={"c1": "+351210000000"})
+
+    state = _run(supabase, tmp_path, overwrite=True)
+
+    assert supabase.phones["c1"] == "+351912345678"
+    assert sorted(supabase.writes) == ["c1", "c2"]
+    assert state["conversations_updated"] == 2
+
+
+def test_resumes_pending_conversation_from_checkpoint(tmp_path):
+    supabase = FakeSupabase(MESSAGES)
+    backfill = PhoneBackfill(
+        supabase,
+        chunk_size=2,
+        workers=1,
+        checkpoint_path=str(tmp_path / "checkpoint.json")
+    )
+
+    paused = asyncio.run(backfill.run(max_messages=2))
+    assert paused["done"] is False
+    assert paused["pending_phones"] == ["+351212345678"]
+    assert supabase.writes == []
+
+    resumed = PhoneBackfill(
+        supabase,
+        chunk_size=2,
+        workers=1,
+        checkpoint_path=str(tmp_path / "checkpoint.json")
+    )
+    state = asyncio.run(resumed.run())
+
+    assert state["done"] is True
+    assert supabase.phones == {"c1": "+351912345678", "c2": "+442079460958"}
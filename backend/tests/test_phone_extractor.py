@@ -0,0 +1,72 @@
+"""
+Testes da extração de telefones
+"""
+import pytest
+from app.services.phone_extractor import best_phone, extract_phones, normalize_phone
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("ligue 912 345 678", "+351912345678"),
+    ("ligue 912345678", "+351912345678"),
+    ("912.345.678", "+351912345678"),
+    ("912-345-678", "+351912345678"),
+    ("912 34 56 78", "+351912345678"),
+    ("91 234 56 78", "+351912345678"),
+    ("tel: 21 234 5678", "+351212345678"),
+    ("+351 912 345 678", "+351912345678"),
+    ("+351912345678", "+351912345678"),
+    ("00351 91 234 56 78", "+351912345678"),
+])
+def test_extracts_portuguese_numbers_in_any_grouping(text, expected):
+    assert extract_phones(text) == [expected]
+
+
+def test_extracts_international_numbers():
+    assert extract_phones("UK: +44 20 7946 0958, BR: 0055 11 91234 5678") == [
+        "+442079460958",
+        "+5511912345678",
+    ]
+
+
+@pytest.mark.parametrize("text", [
+    "ref 123456789",
+    "nif 123456789",
+    "2024-01-15 10:00",
+    "visita às 10:30, T2 com 95 m2",
+    "9123456789",
+    "NIF 234567890",
+    "NIF: 234 567 890",
+    "contribuinte nº 234567890",
+    "NIPC 501234567",
+    "€ 200.000.000",
+    "€ 250.000.000",
+    "preço 250.000.000 €",
+    "200 000 000",
+    "941 234 567",
+    "",
+])
+def test_ignores_non_phone_numbers(text):
+    assert extract_phones(text) == []
+
+
+def test_deduplicates_in_order_of_appearance():
+    text = "fixo 21 234 5678 ou móvel 912 345 678 (212345678)"
+    assert extract_phones(text) == ["+351212345678", "+351912345678"]
+
+
+def test_best_phone_prefers_portuguese_mobile():
+    assert best_phone(["+351212345678", "+351912345678"]) == "+351912345678"
+    assert best_phone(["+442079460958"]) == "+442079460958"
+    assert best_phone([]) is None
+
+
+def test_tax_number_does_not_hide_the_phone():
+    text = "NIF 234567890, telefone 21 234 5678"
+    assert extract_phones(text) == ["+351212345678"]
+
+
+def test_normalize_phone_rejects_invalid_portuguese_numbers():
+    assert normalize_phone("+351 123 456 789") is None
+    assert normalize_phone("123456789") is None
+    assert normalize_phone("200000000") is None
+    assert normalize_phone("+351 941 234 567") is None
@@ -0,0 +1,61 @@
+"""
+Testes das rotas de telefones (/api/phones)
+"""
+from types import SimpleNamespace
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.main import app
+from app.routes import phones as phones_routes
+
+
+class FakeSupabase:
+    """Supabase falso que registra os telefones gravados"""
+
+    def __init__(self):
+        self.client = SimpleNamespace()
+        self.saved = []
+
+    async def update_phone_numbers(self, phones, overwrite=False):
+        self.saved.append((dict(phones), overwrite))
+        return len(phones)
+
+
+def test_extract_runs_in_pool_and_saves_through_service(monkeypatch):
+    supabase = FakeSupabase()
+    monkeypatch.setattr(phones_routes, "supabase_service", supabase)
+    client = TestClient(app)
+
+    try:
+        response = client.post("/api/phones/extract", json={
+            "save": True,
+            "messages": [
+                {"conversation_id": "c1", "content": "fixo 21 234 5678"},
+                {"conversation_id": "c1", "content": "ou 91 234 56 78"},
+                {"conversation_id": "c2", "content": "sem telefone"},
+            ],
+        })
+    finally:
+        phones_routes.shutdown_extract_pool()
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "conversations": {
+            "c1": {
+                "phones": ["+351212345678", "+351912345678"],
+                "phone_number": "+351912345678",
+            },
+        },
+        "updated": 1,
+    }
+    assert supabase.saved == [({"c1": "+351912345678"}, False)]
+
+
+def test_extract_rejects_oversized_batch(monkeypatch):
+    monkeypatch.setattr(settings, "PHONE_EXTRACT_MAX_MESSAGES", 2)
+    client = TestClient(app)
+
+    response = client.post("/api/phones/extract", json={
+        "messages": [{"conversation_id": "c1", "content": "912 345 678"}] * 3,
+    })
+
+    assert response.status_code == 413
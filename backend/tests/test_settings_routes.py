@@ -0,0 +1,120 @@
+"""
+Testes das rotas de configurações (/api/settings)
+"""
+import asyncio
+from types import SimpleNamespace
+import httpx
+from fastapi.testclient import TestClient
+from app.main import app
+from app.routes import settings as settings_routes
+from app.services.settings_cache import SettingsCache
+
+
+class FakeSupabase:
+    """Supabase falso com as duas tabelas de configuração"""
+
+    def __init__(self):
+        self.client = SimpleNamespace()
+        self.reads = 0
+        self.rows = {
+            "general_settings": {"id": "g1", "auto_reload_enabled": True},
+            "agent_ia_settings": {"id": "a1", "openai_key": "sk-secret", "enabled": True},
+        }
+
+    async def get_single_row(self, table):
+        self.reads += 1
+        return dict(self.rows[table])
+
+    async def update_single_row(self, table, updates):
+        self.rows[table].update(updates)
+        return self.rows[table]
+
+
+def _client(monkeypatch):
+    supabase = FakeSupabase()
+    monkeypatch.setattr(settings_routes, "supabase_service", supabase)
+    monkeypatch.setattr(settings_routes, "settings_cache", SettingsCache(supabase))
+    return TestClient(app), supabase
+
+
+def test_settings_hide_openai_key_and_revalidate_with_304(monkeypatch):
+    client, supabase = _client(monkeypatch)
+
+    first = client.get("/api/settings")
+    assert first.status_code == 200
+    assert "openai_key" not in first.json()["agent_ia_settings"]
+    assert first.json()["agent_ia_settings"]["openai_key_configured"] is True
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    second = client.get("/api/settings", headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 304
+    assert supabase.reads == 2  # uma leitura por tabela, depois só cache
+
+
+def test_update_invalidates_cache_and_changes_etag(monkeypatch):
+    client, _ = _client(monkeypatch)
+    etag = client.get("/api/settings").headers["etag"]
+
+    updated = client.put("/api/settings/general", json={"auto_reload_enabled": False})
+    assert updated.status_code == 200
+    assert updated.json()["general_settings"]["auto_reload_enabled"] is False
+
+    again = client.get("/api/settings", headers={"If-None-Match": etag})
+    assert again.status_code == 200
+
+
+class SlowFakeSupabase(FakeSupabase):
+    """Supabase falso em que a primeira leitura de general_settings fica presa"""
+
+    def __init__(self):
+        super().__init__()
+        self.reading = asyncio.Event()
+        self.release = asyncio.Event()
+        self.updated = asyncio.Event()
+        self.slow_reads = 1
+
+    async def get_single_row(self, table):
+        row = await super().get_single_row(table)
+        if table == "general_settings" and self.slow_reads:
+            self.slow_reads -= 1
+            self.reading.set()
+            await self.release.wait()
+        return row
+
+    async def update_single_row(self, table, updates):
+        row = await super().update_single_row(table, updates)
+        self.updated.set()
+        return row
+
+
+def test_update_during_slow_load_does_not_cache_stale_settings(monkeypatch):
+    async def scenario():
+        supabase = SlowFakeSupabase()
+        monkeypatch.setattr(settings_routes, "supabase_service", supabase)
+        monkeypatch.setattr(settings_routes, "settings_cache", SettingsCache(supabase))
+
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            # GET começa a carregar e lê a linha antiga
+            slow_get = asyncio.create_task(client.get("/api/settings"))
+            await supabase.reading.wait()
+
+            # PUT grava e invalida enquanto a carga ainda está em andamento
+            put = asyncio.create_task(
+                client.put("/api/settings/general", json={"auto_reload_enabled": False})
+            )
+            await supabase.updated.wait()
+            await asyncio.sleep(0.05)
+            supabase.release.set()
+
+            await slow_get
+            updated = await put
+            after = await client.get("/api/settings")
+
+        return updated, after
+
+    updated, after = asyncio.run(scenario())
+
+    assert updated.status_code == 200
+    assert updated.json()["general_settings"]["auto_reload_enabled"] is False
+    assert after.json()["general_settings"]["auto_reload_enabled"] is False
+    assert after.headers["etag"] == updated.headers["etag"]
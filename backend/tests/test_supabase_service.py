@@ -0,0 +1,31 @@
+"""
+Testes do SupabaseService
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+from app.services.supabase_service import SupabaseService
+
+
+def test_execute_does_not_block_event_loop():
+    service = SupabaseService()
+
+    def slow_execute():
+        time.sleep(0.3)
+        return SimpleNamespace(data=[])
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        await service._execute(SimpleNamespace(execute=slow_execute))
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(scenario()) > 5
@@ -509,6 +509,35 @@ async function fetchMessagesForAnalysis(conversationId) {
     }
 }
 
+/**
+ * Busca análise já salva (ex.: pela reanálise automática) se estiver atualizada
+ * Retorna null se não existir ou se houver mensagens mais novas que a análise
+ */
+async function fetchSavedAnalysis(conversationId, analysisType, messages) {
+    try {
+        const response = await fetch(`${ANALYSIS_API_URL}/api/analysis/${encodeURIComponent(conversationId)}`);
+        if (!response.ok) {
+            return null;
+        }
+        
+        const data = await response.json();
+        const saved = data.analyses?.[analysisType];
+        if (!saved || !saved.updated_at) {
+            return null;
+        }
+        
+        const lastMessageTime = Math.max(...messages.map(msg => new Date(msg.timestamp).getTime() || 0));
+        if (new Date(saved.updated_at).getTime() < lastMessageTime) {
+            return null;
+        }
+        
+        return saved;
+    } catch (error) {
+        console.warn('⚠️ Erro ao buscar análise salva:', error);
+        return null;
+    }
+}
+
 /**
  * Analisa mensagens de uma conversa
  */
@@ -530,6 +559,15 @@ async function analyzeMessages(conversationId, analysisType) {
             return;
         }
         
+        // Usa análise salva se ainda estiver atualizada
+        const saved = await fetchSavedAnalysis(conversationId, analysisType, messages);
+        if (saved) {
+            console.log('✅ Usando análise salva:', analysisType, saved.updated_at);
+            displayAnalysisResult(saved.result, analysisType);
+            showSuccess('Análise carregada');
+            return;
+        }
+        
         // Chama API de análise
         console.log('🔗 Chamando API:', `${ANALYSIS_API_URL}/api/analysis/analyze`);
         console.log('📦 Dados:', { conversation_id: conversationId, messages_count: messages.length, analysis_type: analysisType });
@@ -134,6 +134,9 @@ async function saveSettings() {
         }
         
         if (saved) {
+            // Invalida o cache de configurações do backend (não bloqueia)
+            fetch(`${ANALYSIS_API_URL}/api/settings/invalidate`, { method: 'POST' }).catch(() => {});
+            
             showSuccess('Configurações salvas com sucesso!');
         } else {
             showError('Erro ao salvar configurações');
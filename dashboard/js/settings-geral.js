@@ -113,6 +113,9 @@ document.addEventListener('DOMContentLoaded', async function() {
 
             if (updateResult.error) throw updateResult.error;
 
+            // Invalida o cache de configurações do backend (não bloqueia)
+            fetch(`${ANALYSIS_API_URL}/api/settings/invalidate`, { method: 'POST' }).catch(() => {});
+
             showSuccess('Configurações Gerais salvas com sucesso!');
             console.log('✅ Configurações salvas:', settingsData);
         } catch (error) {
@@ -2798,9 +2798,41 @@
     }
 
     /**
-     * Carrega configurações gerais do Supabase
+     * Carrega configurações gerais do backend (/api/settings)
+     * O backend responde com ETag e Cache-Control: no-cache, então o navegador
+     * revalida a cópia em cache e, sem mudanças, recebe apenas um 304.
+     * @returns {Promise<Object|null>} general_settings ou null se o backend não responder
+     */
+    async function loadGeneralSettingsFromBackend() {
+        if (!DB_CONFIG.backendUrl) {
+            return null;
+        }
+
+        try {
+            const response = await fetchWithTimeout(`${DB_CONFIG.backendUrl}/api/settings`, {}, 5000);
+            if (!response.ok) {
+                console.warn('⚠️ Backend não retornou configurações gerais:', response.status);
+                return null;
+            }
+            const data = await response.json();
+            return data.general_settings || null;
+        } catch (error) {
+            console.warn('⚠️ Backend indisponível para configurações gerais, usando Supabase:', error.message);
+            return null;
+        }
+    }
+
+    /**
+     * Carrega configurações gerais (backend com cache; Supabase como fallback)
      */
     async function loadGeneralSettings() {
+        const backendSettings = await loadGeneralSettingsFromBackend();
+        if (backendSettings) {
+            generalSettings = backendSettings;
+            console.log('✅ Configurações gerais carregadas do backend:', generalSettings);
+            return generalSettings;
+        }
+
         try {
             if (!DB_CONFIG.supabase.url || !DB_CONFIG.supabase.anonKey) {
                 console.warn('⚠️ Supabase não configurado para Configurações Gerais');
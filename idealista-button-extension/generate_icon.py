@@ -1,61 +1,73 @@
 #!/usr/bin/env python3
 """
 Script para gerar ícones da extensão ImobFlash Agent
-Gera ícones nos tamanhos: 16x16, 48x48, 128x128
+Gera ícones nos tamanhos: 16x16, 48x48, 128x128 (e tamanhos extras via --sizes)
+
+Renderiza um único master em alta resolução (gradiente calculado com NumPy)
+e reduz para cada tamanho. Se nada mudou desde a última geração (hash do
+script e dos tamanhos), não refaz o trabalho.
 """
 
-from PIL import Image, ImageDraw, ImageFont
+import argparse
+import hashlib
+import json
 import os
 
-def create_icon(size):
-    """Cria um ícone no tamanho especificado"""
-    # Cria imagem com fundo transparente
-    img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+import numpy as np
+from PIL import Image, ImageDraw
+
+# Tamanhos exigidos pelo manifest.json
+DEFAULT_SIZES = [16, 48, 128]
+
+# Resolução do master (supersampling para antialiasing na redução)
+MASTER_SIZE = 512
+
+# Cores do gradiente (roxo/azul)
+COLOR1 = (102, 126, 234)  # #667eea
+COLOR2 = (118, 75, 162)   # #764ba2
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+HASH_FILENAME = '.icons.hash'
+
+
+def create_gradient(size):
+    """Cria o fundo circular com gradiente radial (COLOR1 na borda, COLOR2 no centro)"""
+    center = (size - 1) / 2
+    radius = size / 2 - 2 * size / 128
+
+    y, x = np.ogrid[:size, :size]
+    distance = np.sqrt((x - center) ** 2 + (y - center) ** 2)
+
+    ratio = np.clip(1 - distance / radius, 0, 1)[..., None]
+    rgb = np.array(COLOR1) * (1 - ratio) + np.array(COLOR2) * ratio
+
+    alpha = np.where(distance <= radius, 255, 0)[..., None]
+    pixels = np.concatenate([rgb, alpha], axis=-1).astype(np.uint8)
+
+    return Image.fromarray(pixels, 'RGBA')
+
+
+def create_master(size=MASTER_SIZE):
+    """Cria o ícone completo na resolução do master"""
+    img = create_gradient(size)
     draw = ImageDraw.Draw(img)
-    
-    # Cores do gradiente (roxo/azul)
-    color1 = (102, 126, 234)  # #667eea
-    color2 = (118, 75, 162)   # #764ba2
-    
-    # Desenha fundo com gradiente circular
+
     center = size // 2
-    radius = size // 2 - 2
-    
-    # Cria gradiente simples (círculo preenchido)
-    for i in range(radius):
-        # Interpolação de cor
-        ratio = i / radius
-        r = int(color1[0] * (1 - ratio) + color2[0] * ratio)
-        g = int(color1[1] * (1 - ratio) + color2[1] * ratio)
-        b = int(color1[0] * (1 - ratio) + color2[0] * ratio)
-        
-        # Desenha círculo concêntrico
-        draw.ellipse(
-            [center - radius + i, center - radius + i, 
-             center + radius - i, center + radius - i],
-            fill=(r, g, b, 255)
-        )
-    
+    margin = 2 * size // 128
+
     # Desenha borda branca sutil
     draw.ellipse(
-        [2, 2, size - 2, size - 2],
+        [margin, margin, size - margin, size - margin],
         outline=(255, 255, 255, 200),
         width=max(1, size // 32)
     )
-    
-    # Desenha ícone de robô/casa
-    # Cabeça do robô (retângulo arredondado)
-    head_size = int(size * 0.4)
-    head_x = center - head_size // 2
-    head_y = center - head_size // 2 - int(size * 0.1)
-    
+
     # Corpo (casa)
     body_width = int(size * 0.5)
     body_height = int(size * 0.35)
     body_x = center - body_width // 2
     body_y = center + int(size * 0.05)
-    
-    # Desenha casa (corpo do robô)
+
     # Telhado (triângulo)
     roof_points = [
         (center, body_y - int(size * 0.15)),
@@ -63,13 +75,13 @@ def create_icon(size):
         (body_x + body_width, body_y)
     ]
     draw.polygon(roof_points, fill=(255, 255, 255, 255))
-    
+
     # Corpo da casa (retângulo)
     draw.rectangle(
         [body_x, body_y, body_x + body_width, body_y + body_height],
         fill=(255, 255, 255, 255)
     )
-    
+
     # Porta (retângulo pequeno)
     door_width = int(size * 0.15)
     door_height = int(size * 0.2)
@@ -77,44 +89,92 @@ def create_icon(size):
     door_y = body_y + body_height - door_height
     draw.rectangle(
         [door_x, door_y, door_x + door_width, door_y + door_height],
-        fill=(102, 126, 234, 255)
+        fill=COLOR1 + (255,)
     )
-    
+
     # Olhos do robô (dois círculos pequenos no telhado)
     eye_size = max(2, size // 16)
     eye_y = body_y - int(size * 0.1)
-    draw.ellipse(
-        [center - int(size * 0.12) - eye_size, eye_y - eye_size,
-         center - int(size * 0.12) + eye_size, eye_y + eye_size],
-        fill=(102, 126, 234, 255)
-    )
-    draw.ellipse(
-        [center + int(size * 0.12) - eye_size, eye_y - eye_size,
-         center + int(size * 0.12) + eye_size, eye_y + eye_size],
-        fill=(102, 126, 234, 255)
-    )
-    
+    for offset in (-int(size * 0.12), int(size * 0.12)):
+        draw.ellipse(
+            [center + offset - eye_size, eye_y - eye_size,
+             center + offset + eye_size, eye_y + eye_size],
+            fill=COLOR1 + (255,)
+        )
+
     return img
 
+
+def create_icon(size, master=None):
+    """Cria um ícone no tamanho especificado a partir do master"""
+    if master is None:
+        master = create_master()
+    if size == master.width:
+        return master.copy()
+    return master.resize((size, size), Image.LANCZOS)
+
+
+def inputs_hash(sizes):
+    """Hash do conteúdo que determina os ícones (script, master e tamanhos)"""
+    digest = hashlib.sha256()
+    with open(os.path.abspath(__file__), 'rb') as f:
+        digest.update(f.read())
+    digest.update(json.dumps({'master': MASTER_SIZE, 'sizes': sizes}).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def is_up_to_date(icons_dir, sizes, content_hash):
+    """Verifica se os ícones já foram gerados com o mesmo hash"""
+    hash_path = os.path.join(icons_dir, HASH_FILENAME)
+    if not os.path.exists(hash_path):
+        return False
+    with open(hash_path, 'r', encoding='utf-8') as f:
+        if f.read().strip() != content_hash:
+            return False
+    return all(
+        os.path.exists(os.path.join(icons_dir, f'icon{size}.png'))
+        for size in sizes
+    )
+
+
 def main():
     """Gera todos os ícones necessários"""
-    sizes = [16, 48, 128]
-    icons_dir = 'icons'
-    
+    parser = argparse.ArgumentParser(description='Gera os ícones da extensão')
+    parser.add_argument('--sizes', type=int, nargs='*', default=[],
+                        help='Tamanhos extras além de 16, 48 e 128')
+    parser.add_argument('--output', default=os.path.join(SCRIPT_DIR, 'icons'),
+                        help='Diretório de saída')
+    parser.add_argument('--force', action='store_true',
+                        help='Gera mesmo que nada tenha mudado')
+    args = parser.parse_args()
+
+    sizes = sorted(set(DEFAULT_SIZES + args.sizes))
+    icons_dir = args.output
+    content_hash = inputs_hash(sizes)
+
+    if not args.force and is_up_to_date(icons_dir, sizes, content_hash):
+        print(f"✅ Ícones já atualizados em {icons_dir}/ (nada a fazer)")
+        return
+
     # Cria diretório de ícones se não existir
     os.makedirs(icons_dir, exist_ok=True)
-    
+
     print("🎨 Gerando ícones da extensão ImobFlash Agent...")
-    
+
+    master = create_master(max(MASTER_SIZE, max(sizes)))
+
     for size in sizes:
-        icon = create_icon(size)
-        filename = f'{icons_dir}/icon{size}.png'
-        icon.save(filename, 'PNG')
+        icon = create_icon(size, master)
+        filename = os.path.join(icons_dir, f'icon{size}.png')
+        icon.save(filename, 'PNG', optimize=True)
         print(f"✅ Criado: {filename} ({size}x{size})")
-    
+
+    with open(os.path.join(icons_dir, HASH_FILENAME), 'w', encoding='utf-8') as f:
+        f.write(content_hash)
+
     print("\n✨ Ícones gerados com sucesso!")
     print(f"📁 Diretório: {icons_dir}/")
 
+
 if __name__ == '__main__':
     main()
-